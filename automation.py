@@ -148,12 +148,14 @@ def check_for_new_data():
                     blob.download_to_filename(tmp_file.name)
                     
                     # Read last few rows to get latest date
-                    df_sample = pd.read_csv(tmp_file.name, nrows=1000)
+                    df_sample = pd.read_csv(tmp_file.name, nrows=1000,
+                                            usecols=lambda col: col in ('year', 'month_number'))
                     if 'year' in df_sample.columns and 'month_number' in df_sample.columns:
-                        df_sample['date'] = pd.to_datetime(
-                            df_sample['year'].astype(str) + '-' + 
-                            df_sample['month_number'].astype(str).str.zfill(2) + '-01'
-                        )
+                        df_sample['date'] = pd.to_datetime({
+                            'year': df_sample['year'],
+                            'month': df_sample['month_number'],
+                            'day': 1
+                        })
                         latest_data_date = df_sample['date'].max()
                         logger.info(f"Latest date in existing data: {latest_data_date}")
                     
@@ -25,23 +25,42 @@ except Exception:
 # Now import other modules
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
 from plotly.subplots import make_subplots
 import warnings
 from datetime import datetime
 import sys
 import os
 import tempfile
-import json
+import weakref
+import csv
+
+# Service-account credentials shared by the GCS and BigQuery clients (google-auth is installed with either)
+try:
+    from google.oauth2 import service_account
+except ImportError:
+    service_account = None
 
 # Try to import Google Cloud Storage (optional - for Streamlit Cloud)
 try:
     from google.cloud import storage
+    from google.cloud.exceptions import NotFound
     GCS_AVAILABLE = True
 except ImportError:
     GCS_AVAILABLE = False
 
+# Try to import the GCS transfer manager (google-cloud-storage >= 2.10 - parallel ranged downloads)
+try:
+    from google.cloud.storage import transfer_manager
+    GCS_TRANSFER_MANAGER_AVAILABLE = True
+except ImportError:
+    GCS_TRANSFER_MANAGER_AVAILABLE = False
+
 # Try to import BigQuery (for efficient querying of large datasets)
 try:
     from google.cloud import bigquery
@@ -49,8 +68,23 @@ try:
 except ImportError:
     BIGQUERY_AVAILABLE = False
 
-# Add current directory to path for imports
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# Try to import the BigQuery Storage API (optional - faster Arrow downloads than REST paging)
+try:
+    from google.cloud import bigquery_storage
+    BQSTORAGE_AVAILABLE = True
+except ImportError:
+    BQSTORAGE_AVAILABLE = False
+
+@st.cache_resource(show_spinner=False)
+def _initialize_once():
+    """Process-wide setup - runs on the first script run only, not on every rerun"""
+    warnings.filterwarnings('ignore')
+    # Add current directory to path for imports (once, so sys.path does not grow per rerun)
+    app_dir = os.path.dirname(os.path.abspath(__file__))
+    if app_dir not in sys.path:
+        sys.path.append(app_dir)
+
+_initialize_once()
 
 # Import commodity mapping (with fallback)
 # Use broad exception handling to catch any import errors during health checks
@@ -65,60 +99,100 @@ except (ImportError, ModuleNotFoundError, AttributeError, Exception):
     def map_commodity_code_to_sitc_industry(code):
         return "Unknown"
 
-warnings.filterwarnings('ignore')
+# Target dtypes for the numeric columns, shared by every loader so chunks never need upcasting
+DTYPES = {
+    'year': 'int16',
+    'month_number': 'int8',
+    'valuecif': 'float32',
+    'valuefob': 'float32',
+    'weight': 'float32',
+    'quantity': 'float32',
+}
+
+# Local cache for Parquet copies of the GCS file - survives reruns and app restarts on the same host
+GCS_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'freight-import-data-cache')
+
+# Columns the dashboard sections actually read - everything else is left at the source
+DASHBOARD_COLUMNS = [
+    'year', 'month', 'month_number',
+    'country_description', 'commodity_code', 'commodity_description',
+    'mode_description', 'ausport_description', 'osport_description', 'state',
+    'valuefob', 'valuecif', 'weight', 'quantity',
+]
+
+# Repeated text columns held as pandas categoricals - groupby/isin then work on small int codes
+CATEGORICAL_COLUMNS = [
+    'month', 'mode_description', 'commodity_description',
+    'ausport_description', 'osport_description', 'state',
+    'country_code', 'country_description', 'unit_quantity',
+]
+
+# Column types for the cleaned CSV, declared up front so the Arrow reader skips type inference
+# Integer columns are read as float64 - pandas writes an int column that has any missing value as
+# '11.0', which a strict int parse would reject for the whole file - and narrowed after the load
+# by _cast_integer_columns. Categorical columns are dictionary-encoded and arrive in pandas as
+# categoricals (Arrow's CSV reader only supports int32 dictionary indices)
+CSV_COLUMN_TYPES = {
+    **{col: pa.float64() if np.dtype(dtype).kind == 'i' else pa.from_numpy_dtype(np.dtype(dtype))
+       for col, dtype in DTYPES.items()},
+    **{col: pa.dictionary(pa.int32(), pa.string()) for col in CATEGORICAL_COLUMNS},
+}
+
+# Custom CSS - built once as a constant; it still has to be emitted on every run
+# because Streamlit drops any element that a rerun does not re-send
+CUSTOM_CSS = """
+<style>
+.main-header {
+    font-size: 2.5rem;
+    font-weight: bold;
+    color: #1f77b4;
+    text-align: center;
+    padding: 1rem 0;
+}
+.section-header {
+    font-size: 1.8rem;
+    font-weight: bold;
+    color: #2c3e50;
+    margin-top: 2rem;
+    margin-bottom: 1rem;
+    border-bottom: 3px solid #1f77b4;
+    padding-bottom: 0.5rem;
+}
+.metric-card {
+    background-color: #f0f2f6;
+    padding: 1rem;
+    border-radius: 0.5rem;
+    border-left: 4px solid #1f77b4;
+}
+.nav-button {
+    background-color: #1f77b4;
+    color: white;
+    padding: 0.5rem 1.5rem;
+    border: none;
+    border-radius: 5px;
+    cursor: pointer;
+    font-size: 1rem;
+    margin: 0.5rem;
+}
+.nav-button:hover {
+    background-color: #155a8a;
+}
+.nav-container {
+    display: flex;
+    justify-content: space-between;
+    align-items: center;
+    padding: 1rem;
+    background-color: #f8f9fa;
+    border-radius: 10px;
+    margin: 1rem 0;
+}
+</style>
+"""
 
-# Custom CSS - moved to function to avoid module-level execution issues
 def apply_custom_css():
     """Apply custom CSS styles"""
     try:
-        st.markdown("""
-            <style>
-            .main-header {
-                font-size: 2.5rem;
-                font-weight: bold;
-                color: #1f77b4;
-                text-align: center;
-                padding: 1rem 0;
-            }
-            .section-header {
-                font-size: 1.8rem;
-                font-weight: bold;
-                color: #2c3e50;
-                margin-top: 2rem;
-                margin-bottom: 1rem;
-                border-bottom: 3px solid #1f77b4;
-                padding-bottom: 0.5rem;
-            }
-            .metric-card {
-                background-color: #f0f2f6;
-                padding: 1rem;
-                border-radius: 0.5rem;
-                border-left: 4px solid #1f77b4;
-            }
-            .nav-button {
-                background-color: #1f77b4;
-                color: white;
-                padding: 0.5rem 1.5rem;
-                border: none;
-                border-radius: 5px;
-                cursor: pointer;
-                font-size: 1rem;
-                margin: 0.5rem;
-            }
-            .nav-button:hover {
-                background-color: #155a8a;
-            }
-            .nav-container {
-                display: flex;
-                justify-content: space-between;
-                align-items: center;
-                padding: 1rem;
-                background-color: #f8f9fa;
-                border-radius: 10px;
-                margin: 1rem 0;
-            }
-            </style>
-        """, unsafe_allow_html=True)
+        st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
     except Exception:
         # CSS failed to load, continue without it
         pass
@@ -152,6 +226,30 @@ def _get_max_rows_limit():
 
     return limit
 
+@st.cache_resource(show_spinner=False)
+def _get_gcp_credentials(credentials_dict):
+    """Build service-account credentials from the secrets dict
+    Cached as a resource so every GCS/BigQuery client shares one Credentials
+    object and its access token, without writing the key to disk
+    """
+    return service_account.Credentials.from_service_account_info(credentials_dict)
+
+@st.cache_resource(show_spinner=False)
+def _get_storage_client(credentials_dict):
+    """GCS client shared across reruns and sessions, so loads reuse its HTTP connection pool"""
+    return storage.Client(credentials=_get_gcp_credentials(credentials_dict),
+                          project=credentials_dict.get('project_id'))
+
+@st.cache_resource(show_spinner=False)
+def _get_bigquery_client(credentials_dict, project_id):
+    """BigQuery client shared across reruns and sessions (same reuse as _get_storage_client)"""
+    return bigquery.Client(credentials=_get_gcp_credentials(credentials_dict), project=project_id)
+
+@st.cache_resource(show_spinner=False)
+def _get_bigquery_read_client(credentials_dict):
+    """BigQuery Storage read client shared across reruns and sessions (same reuse as _get_storage_client)"""
+    return bigquery_storage.BigQueryReadClient(credentials=_get_gcp_credentials(credentials_dict))
+
 def _load_data_from_gcs_internal(show_progress=False):
     """Internal function to load data from GCS without Streamlit widgets
     This can be called from cached functions
@@ -191,16 +289,11 @@ def _load_data_from_gcs_internal(show_progress=False):
         # Create credentials dict from secrets
         credentials_dict = dict(gcp_config['credentials'])
         
-        # Create temporary file for credentials
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as creds_file:
-            json.dump(credentials_dict, creds_file)
-            creds_path = creds_file.name
-        
         try:
-            # Initialize GCS client with credentials
+            # Initialize GCS client with in-memory credentials
             # if show_progress:
             #     st.info(f"Authenticating with Google Cloud Storage...")
-            client = storage.Client.from_service_account_json(creds_path)
+            client = _get_storage_client(credentials_dict)
             
             # if show_progress:
             #     st.info(f"Accessing bucket: `{bucket_name}`")
@@ -210,8 +303,37 @@ def _load_data_from_gcs_internal(show_progress=False):
             #     st.info(f"Looking for file: `{file_name}`")
             blob = bucket.blob(file_name)
             
-            # Check if file exists
-            if not blob.exists():
+            try:
+                # One metadata request: the object's generation changes on every upload, so it
+                # tells whether a Parquet copy from an earlier load is still current
+                blob.reload()
+                cache_path = _gcs_cache_path(file_name, blob.generation)
+                
+                if os.path.exists(cache_path):
+                    data_path = cache_path
+                else:
+                    # Download to temporary file
+                    # if show_progress:
+                    #     progress_bar = st.progress(0)
+                    #     st.info(f"Downloading `{file_name}` from Google Cloud Storage...")
+                    
+                    with tempfile.NamedTemporaryFile(mode='wb', suffix='.csv', delete=False) as tmp_file:
+                        tmp_path = tmp_file.name
+                    
+                    if GCS_TRANSFER_MANAGER_AVAILABLE:
+                        # 16MB range requests fetched on parallel threads, written in place into the file
+                        transfer_manager.download_chunks_concurrently(
+                            blob, tmp_path, chunk_size=16 << 20,
+                            worker_type=transfer_manager.THREAD, max_workers=8
+                        )
+                    else:
+                        blob.download_to_filename(tmp_path)
+                    
+                    # Keep a Parquet copy for later loads of the same generation (falls back to the CSV)
+                    data_path = _ensure_parquet(tmp_path, parquet_path=cache_path)
+                    if data_path == cache_path:
+                        _remove_stale_gcs_caches(cache_path)
+            except NotFound:
                 if show_progress:
                     st.error(f"File `{file_name}` not found in bucket `{bucket_name}`")
                     st.info("""
@@ -222,23 +344,6 @@ def _load_data_from_gcs_internal(show_progress=False):
                     """)
                 return None
             
-            # Show loading progress
-            file_size = blob.size
-            # if show_progress:
-            #     if file_size is not None:
-            #         st.info(f"File size: {file_size / (1024*1024):.2f} MB")
-            #     else:
-            #         st.info("File size: Unknown")
-            
-            # Download to temporary file
-            # if show_progress:
-            #     progress_bar = st.progress(0)
-            #     st.info(f"Downloading `{file_name}` from Google Cloud Storage...")
-            
-            with tempfile.NamedTemporaryFile(mode='wb', suffix='.csv', delete=False) as tmp_file:
-                blob.download_to_filename(tmp_file.name)
-                tmp_path = tmp_file.name
-            
             # if show_progress:
             #     progress_bar.progress(100)
             #     st.success("File downloaded successfully!")
@@ -253,7 +358,7 @@ def _load_data_from_gcs_internal(show_progress=False):
             #     st.info("This will load all 4.48M rows efficiently in chunks.")
             
             # Load all data (no limit) - chunked loading handles memory efficiently
-            df = load_data_from_file(tmp_path, max_rows=max_rows)
+            df = load_data_from_file(data_path, max_rows=max_rows)
             
             if df is None:
                 # Error already displayed in load_data_from_file
@@ -270,9 +375,6 @@ def _load_data_from_gcs_internal(show_progress=False):
             
             return df
         finally:
-            # Clean up credentials file
-            if os.path.exists(creds_path):
-                os.unlink(creds_path)
             # Clean up data file after loading
             if 'tmp_path' in locals() and os.path.exists(tmp_path):
                 os.unlink(tmp_path)
@@ -317,14 +419,19 @@ def load_data_from_gcs():
     """Load data from Google Cloud Storage (with progress indicators)"""
     return _load_data_from_gcs_internal(show_progress=True)
 
-@st.cache_data(ttl=600)  # Cache for 10 minutes
-def query_bigquery(filters=None, limit_rows=None):
+# Held as a shared resource for 10 minutes: a cache_data hit would unpickle a fresh copy of up
+# to 2M rows on every rerun, while this hands back the same frame (and so reuses its _frame_key).
+# The frame is read-only - sections filter into new frames and never assign into it
+@st.cache_resource(ttl=600, max_entries=1, show_spinner=False)
+def query_bigquery(filters=None, limit_rows=None, columns=None):
     """Query data from BigQuery with optional filters and row limit
     This is much more memory-efficient for large datasets
     
     Args:
         filters: Dict of filters like {'year': [2024, 2025], 'month': ['January', 'February'], 'country': ['China']}
         limit_rows: Maximum number of rows to return (None = no limit, but recommended to use limit for large datasets)
+        columns: List of columns to select (None = all columns). BigQuery is columnar, so only
+                 the named columns are scanned, billed and transferred
     
     Returns:
         pandas.DataFrame or None
@@ -356,412 +463,306 @@ def query_bigquery(filters=None, limit_rows=None):
         # Create credentials dict from secrets
         credentials_dict = dict(gcp_config['credentials'])
         
-        # Create temporary file for credentials
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as creds_file:
-            json.dump(credentials_dict, creds_file)
-            creds_path = creds_file.name
+        # Get project ID from credentials if not set
+        if not project_id:
+            project_id = credentials_dict.get('project_id')
+        
+        if not project_id:
+            return None
+        
+        # Initialize BigQuery client with in-memory credentials
+        client = _get_bigquery_client(credentials_dict, project_id)
+        
+        # Build query with filters
+        table_ref = f"{project_id}.{dataset_id}.{table_id}"
+        select_clause = ", ".join(f"`{c}`" for c in columns) if columns else "*"
+        query = f"SELECT {select_clause} FROM `{table_ref}`"
+        
+        # Add WHERE conditions based on filters
+        # Values are bound as query parameters so the SQL text stays identical for every
+        # filter set (BigQuery can serve repeats from its result cache) and needs no escaping
+        where_conditions = []
+        query_parameters = []
+        if filters:
+            if 'year' in filters and filters['year']:
+                where_conditions.append("year IN UNNEST(@years)")
+                query_parameters.append(bigquery.ArrayQueryParameter('years', 'INT64', [int(y) for y in filters['year']]))
+            if 'month' in filters and filters['month']:
+                where_conditions.append("month IN UNNEST(@months)")
+                query_parameters.append(bigquery.ArrayQueryParameter('months', 'STRING', list(filters['month'])))
+            if 'country' in filters and filters['country']:
+                where_conditions.append("country_description IN UNNEST(@countries)")
+                query_parameters.append(bigquery.ArrayQueryParameter('countries', 'STRING', list(filters['country'])))
+        
+        if where_conditions:
+            query += " WHERE " + " AND ".join(where_conditions)
+        
+        # Add LIMIT only if specified (for full dataset, no limit)
+        if limit_rows is not None:
+            query += f" LIMIT {limit_rows}"
+        
+        # Execute query with timeout protection
+        import time
+        
+        # Show different messages based on whether we're loading all data
+        # if limit_rows is None or limit_rows > 3000000:
+        #     st.info(f"Executing BigQuery query for full dataset (4.48M rows)...")
+        #     st.info("This may take 5-15 minutes. BigQuery is processing and transferring data...")
+        #     timeout_seconds = 900  # 15 minute timeout for full dataset
+        # else:
+        #     st.info(f"Executing BigQuery query (limit: {limit_rows:,} rows)...")
+        #     timeout_seconds = 300  # 5 minute timeout for limited queries
+        
+        # Set timeout based on query size
+        if limit_rows is None or limit_rows > 3000000:
+            timeout_seconds = 900  # 15 minute timeout for full dataset
+        else:
+            timeout_seconds = 300  # 5 minute timeout for limited queries
+        
+        job_config = bigquery.QueryJobConfig(query_parameters=query_parameters, use_query_cache=True)
+        query_job = client.query(query, job_config=job_config)
         
         try:
-            # Initialize BigQuery client
-            if project_id:
-                client = bigquery.Client.from_service_account_json(creds_path, project=project_id)
-            else:
-                client = bigquery.Client.from_service_account_json(creds_path)
+            # Poll for completion with timeout and progress updates
+            start_time = time.time()
+            # progress_bar = st.progress(0)
+            # status_text = st.empty()
             
-            # Get project ID from credentials if not set
-            if not project_id:
-                with open(creds_path, 'r') as f:
-                    creds_data = json.load(f)
-                    project_id = creds_data.get('project_id')
-                    if project_id:
-                        client.project = project_id
+            while not query_job.done():
+                elapsed = time.time() - start_time
+                elapsed_minutes = int(elapsed // 60)
+                elapsed_seconds = int(elapsed % 60)
+                
+                # Update progress (estimate based on elapsed time vs timeout)
+                # if timeout_seconds > 0:
+                #     progress = min(elapsed / timeout_seconds, 0.95)  # Cap at 95% until done
+                #     progress_bar.progress(progress)
+                
+                # Update status message
+                # status_text.info(f"Query running... Elapsed: {elapsed_minutes}m {elapsed_seconds}s")
+                
+                if elapsed > timeout_seconds:
+                    query_job.cancel()
+                    # progress_bar.progress(1.0)
+                    raise TimeoutError(f"Query exceeded {timeout_seconds} second timeout")
+                
+                time.sleep(3)  # Check every 3 seconds
             
-            # Also try to get from client if still not set
-            if not project_id and hasattr(client, 'project') and client.project:
-                project_id = client.project
+            # Query completed - stream the results instead of loading them in one go
+            # progress_bar.progress(0.98)
             
-            if not project_id:
+            if query_job.errors:
+                error_msg = str(query_job.errors)
+                # progress_bar.progress(1.0)
+                st.error(f"BigQuery query error: {error_msg}")
                 return None
             
-            # Build query with filters
-            table_ref = f"{project_id}.{dataset_id}.{table_id}"
-            query = f"SELECT * FROM `{table_ref}`"
-            
-            # Add WHERE conditions based on filters
-            where_conditions = []
-            if filters:
-                if 'year' in filters and filters['year']:
-                    years = ', '.join([str(y) for y in filters['year']])
-                    where_conditions.append(f"year IN ({years})")
-                if 'month' in filters and filters['month']:
-                    # Escape single quotes in month names for SQL
-                    escaped_months = [m.replace("'", "''") for m in filters['month']]
-                    months = ', '.join([f"'{m}'" for m in escaped_months])
-                    where_conditions.append(f"month IN ({months})")
-                if 'country' in filters and filters['country']:
-                    # Escape single quotes in country names for SQL
-                    escaped_countries = [c.replace("'", "''") for c in filters['country']]
-                    countries = ', '.join([f"'{c}'" for c in escaped_countries])
-                    where_conditions.append(f"country_description IN ({countries})")
-            
-            if where_conditions:
-                query += " WHERE " + " AND ".join(where_conditions)
-            
-            # Add LIMIT only if specified (for full dataset, no limit)
-            if limit_rows is not None:
-                query += f" LIMIT {limit_rows}"
-            
-            # Execute query with timeout protection
-            import time
-            
-            # Show different messages based on whether we're loading all data
-            # if limit_rows is None or limit_rows > 3000000:
-            #     st.info(f"Executing BigQuery query for full dataset (4.48M rows)...")
-            #     st.info("This may take 5-15 minutes. BigQuery is processing and transferring data...")
-            #     timeout_seconds = 900  # 15 minute timeout for full dataset
-            # else:
-            #     st.info(f"Executing BigQuery query (limit: {limit_rows:,} rows)...")
-            #     timeout_seconds = 300  # 5 minute timeout for limited queries
-            
-            # Set timeout based on query size
-            if limit_rows is None or limit_rows > 3000000:
-                timeout_seconds = 900  # 15 minute timeout for full dataset
-            else:
-                timeout_seconds = 300  # 5 minute timeout for limited queries
+            # Write each result batch straight to a disk-backed Arrow IPC file instead of
+            # keeping every chunk in RAM - peak memory is one batch plus the final dataframe
+            max_rows_loaded = 5000000  # Safety limit: max 5M rows
+            total_rows_loaded = 0
+            bqstorage_client = None
+            if BQSTORAGE_AVAILABLE:
+                bqstorage_client = _get_bigquery_read_client(credentials_dict)
             
-            query_job = client.query(query)
+            with tempfile.NamedTemporaryFile(mode='wb', suffix='.arrow', delete=False) as arrow_file:
+                arrow_path = arrow_file.name
             
             try:
-                # Poll for completion with timeout and progress updates
-                start_time = time.time()
-                # progress_bar = st.progress(0)
-                # status_text = st.empty()
-                
-                while not query_job.done():
-                    elapsed = time.time() - start_time
-                    elapsed_minutes = int(elapsed // 60)
-                    elapsed_seconds = int(elapsed % 60)
-                    
-                    # Update progress (estimate based on elapsed time vs timeout)
-                    # if timeout_seconds > 0:
-                    #     progress = min(elapsed / timeout_seconds, 0.95)  # Cap at 95% until done
-                    #     progress_bar.progress(progress)
-                    
-                    # Update status message
-                    # status_text.info(f"Query running... Elapsed: {elapsed_minutes}m {elapsed_seconds}s")
-                    
-                    if elapsed > timeout_seconds:
-                        query_job.cancel()
-                        # progress_bar.progress(1.0)
-                        raise TimeoutError(f"Query exceeded {timeout_seconds} second timeout")
-                    
-                    time.sleep(3)  # Check every 3 seconds
-                
-                # Query completed - get results in chunks to avoid memory issues
-                # progress_bar.progress(0.98)
-                
-                if query_job.errors:
-                    error_msg = str(query_job.errors)
-                    # progress_bar.progress(1.0)
-                    st.error(f"BigQuery query error: {error_msg}")
-                    return None
-                
-                # Load data in chunks to prevent memory overflow
-                # Use smaller chunks (100K) to stay well within memory limits
-                chunk_size = 100000  # 100K rows per chunk (much safer)
-                all_chunks = []
-                total_rows_loaded = 0
-                
-                # Load data in chunks using multiple queries with LIMIT/OFFSET
-                # Need ORDER BY for consistent pagination
-                # status_text.info("Loading data in chunks (100K rows each) to prevent memory issues...")
-                
-                # Check if query already has ORDER BY
-                query_lower = query.lower()
-                has_order_by = 'order by' in query_lower
-                
-                # Add ORDER BY if not present (needed for consistent pagination)
-                # Use a simple, reliable ordering
-                if not has_order_by:
-                    # Try to use year, month_number if they exist, otherwise use first column
-                    # We'll check if columns exist in the actual query result
-                    paginated_query = query + ' ORDER BY year, month_number, country_code, commodity_code'
-                else:
-                    paginated_query = query
-                
-                chunk_num = 0
-                max_chunks = 50  # Safety limit: max 5M rows (50 chunks * 100K)
-                
+                writer = None
                 try:
-                    while chunk_num < max_chunks:
-                        chunk_num += 1
-                        offset = (chunk_num - 1) * chunk_size
-                        
-                        # Build chunk query
-                        chunk_query = paginated_query + f" LIMIT {chunk_size} OFFSET {offset}"
-                        
-                        # status_text.info(f"Loading chunk {chunk_num} (500K rows each)... Offset: {offset:,}")
-                        
-                        # Execute chunk query
-                        chunk_job = client.query(chunk_query)
-                        
-                        # Wait for chunk query to complete
-                        chunk_start_time = time.time()
-                        while not chunk_job.done():
-                            if time.time() - chunk_start_time > 60:  # 1 min timeout per chunk
-                                st.warning(f"Chunk {chunk_num} timeout. Stopping chunked load.")
-                                break
-                            time.sleep(1)
-                        
-                        if chunk_job.errors:
-                            if chunk_num == 1:
-                                # First chunk failed - this is a problem
-                                raise Exception(f"Chunk query failed: {chunk_job.errors}")
-                            else:
-                                # Later chunk failed - we've probably reached the end
-                                break
+                    for batch in query_job.result().to_arrow_iterable(bqstorage_client=bqstorage_client):
+                        if writer is None:
+                            writer = pa.ipc.new_file(arrow_path, batch.schema)
+                        writer.write_batch(batch)
+                        total_rows_loaded += batch.num_rows
                         
-                        # Load chunk into dataframe with error handling
-                        try:
-                            df_chunk = chunk_job.to_dataframe(max_results=chunk_size)
-                        except Exception as df_error:
-                            # If max_results doesn't work, try without it
-                            try:
-                                df_chunk = chunk_job.to_dataframe()
-                            except Exception as df_error2:
-                                st.error(f"Error loading chunk {chunk_num} into dataframe: {str(df_error2)}")
-                                if chunk_num == 1:
-                                    raise df_error2
-                                else:
-                                    break
+                        # status_text.info(f"Loaded {total_rows_loaded:,} rows...")
                         
-                        if df_chunk is None or len(df_chunk) == 0:
-                            # No more data
+                        if total_rows_loaded >= max_rows_loaded:
                             break
-                        
-                        # Optimize data types immediately to reduce memory
-                        try:
-                            if 'year' in df_chunk.columns:
-                                df_chunk['year'] = pd.to_numeric(df_chunk['year'], downcast='integer')
-                            if 'month_number' in df_chunk.columns:
-                                df_chunk['month_number'] = pd.to_numeric(df_chunk['month_number'], downcast='integer')
-                            
-                            float_cols = ['valuecif', 'valuefob', 'weight', 'quantity']
-                            for col in float_cols:
-                                if col in df_chunk.columns:
-                                    df_chunk[col] = pd.to_numeric(df_chunk[col], downcast='float')
-                        except Exception as opt_error:
-                            # Optimization failed, but continue with chunk
-                            st.warning(f"Warning: Could not optimize chunk {chunk_num} data types: {str(opt_error)}")
-                        
-                        all_chunks.append(df_chunk)
-                        total_rows_loaded += len(df_chunk)
-                        
-                        # Update progress
-                        # progress = min(0.98, chunk_num / max_chunks)
-                        # progress_bar.progress(progress)
-                        # status_text.info(f"Loaded chunk {chunk_num}: {len(df_chunk):,} rows (Total: {total_rows_loaded:,})")
-                        
-                        # If chunk is smaller than chunk_size, we've reached the end
-                        if len(df_chunk) < chunk_size:
-                            break
-                        
-                        # Free memory after every chunk to prevent accumulation
-                        import gc
-                        gc.collect()
+                finally:
+                    if writer is not None:
+                        writer.close()
                 
-                except Exception as chunk_error:
-                    # If chunking fails, try to use what we have
-                    import traceback
-                    error_trace = traceback.format_exc()
-                    print(f"Chunked loading error: {error_trace}", file=sys.stderr)
-                    
-                    if len(all_chunks) > 0:
-                        st.warning(f"Error during chunked loading: {str(chunk_error)}. Using {total_rows_loaded:,} rows loaded so far.")
-                    else:
-                        # No chunks loaded - suggest fallback to GCS
-                        st.error(f"Chunked loading failed: {str(chunk_error)}")
-                        st.warning("BigQuery chunked loading is not working. Falling back to GCS...")
-                        return None  # Will trigger fallback to GCS
-                
-                # Combine all chunks
-                if not all_chunks:
+                if total_rows_loaded == 0:
                     st.error("No data loaded from BigQuery")
                     return None
                 
-                # status_text.info(f"Combining {len(all_chunks)} chunks...")
-                
-                # If we only have a few chunks, combine all at once
-                if len(all_chunks) <= 5:
-                    df = pd.concat(all_chunks, ignore_index=True)
-                else:
-                    # For many chunks, combine incrementally in batches
-                    df = all_chunks[0]
-                    batch_size = 3
-                    for i in range(1, len(all_chunks), batch_size):
-                        batch = all_chunks[i:i+batch_size]
-                        if len(batch) == 1:
-                            df = pd.concat([df, batch[0]], ignore_index=True)
-                        else:
-                            batch_df = pd.concat(batch, ignore_index=True)
-                            df = pd.concat([df, batch_df], ignore_index=True)
-                            del batch_df
-                        
-                        # Free memory after each batch
-                        import gc
-                        gc.collect()
-                        # status_text.info(f"Combined {min(i+batch_size, len(all_chunks))}/{len(all_chunks)} chunks...")
-                
-                # Final cleanup
-                del all_chunks
-                import gc
-                gc.collect()
-                
-                # Verify final dataframe
-                if df is None or len(df) == 0:
-                    st.error("Failed to combine chunks - empty dataframe")
-                    return None
-                
-                # progress_bar.progress(1.0)
-                # status_text.empty()
-                # st.success(f"Successfully loaded {len(df):,} rows from BigQuery in {chunk_num} chunks!")
-                
-            except TimeoutError as e:
-                st.error(f"Query timeout after {timeout_seconds} seconds.")
-                st.warning("The dataset is too large. Falling back to GCS with row limit...")
-                return None
-            except Exception as e:
-                error_msg = str(e)
-                st.error(f"BigQuery query failed: {error_msg}")
-                st.warning("Falling back to other data sources...")
-                return None
+                # Memory-map the file so reading it back is zero-copy - to_pandas makes the one allocation
+                table = pa.ipc.open_file(pa.memory_map(arrow_path)).read_all()
+                df = table.to_pandas(self_destruct=True)
+                del table
+            finally:
+                # Clean up Arrow file after loading
+                if os.path.exists(arrow_path):
+                    os.unlink(arrow_path)
             
-            # Optimize data types after loading
-            if 'year' in df.columns:
-                df['year'] = df['year'].astype('int16')
-            if 'month_number' in df.columns:
-                df['month_number'] = df['month_number'].astype('int8')
+            # progress_bar.progress(1.0)
+            # status_text.empty()
+            # st.success(f"Successfully loaded {len(df):,} rows from BigQuery!")
             
-            float_cols = ['valuecif', 'valuefob', 'weight', 'quantity']
-            for col in float_cols:
-                if col in df.columns:
-                    df[col] = pd.to_numeric(df[col], downcast='float')
-            
-            # NOTE: We intentionally do NOT create 'industry_sector' or 'date' columns here
-            # These are expensive operations on 4.48M rows that cause memory crashes.
-            # Instead, they are created on-demand in the visualization functions:
-            # - 'date' column: Created in show_time_series() for aggregated monthly_stats only (~24 rows)
-            # - 'industry_sector' column: Created in show_value_volume_analysis() and show_commodity_analysis()
-            #   using optimized approaches (unique codes mapping)
-            
-            return df
-            
-        finally:
-            # Clean up credentials file
-            if os.path.exists(creds_path):
-                os.unlink(creds_path)
-                
+        except TimeoutError as e:
+            st.error(f"Query timeout after {timeout_seconds} seconds.")
+            st.warning("The dataset is too large. Falling back to GCS with row limit...")
+            return None
+        except Exception as e:
+            error_msg = str(e)
+            st.error(f"BigQuery query failed: {error_msg}")
+            st.warning("Falling back to other data sources...")
+            return None
+        
+        # Optimize data types once after loading - same numeric and categorical layout as the CSV path
+        # (year/month_number go through _cast_integer_columns: a NULL would fail a plain int cast)
+        target_dtypes = {
+            **{col: dtype for col, dtype in DTYPES.items() if np.dtype(dtype).kind != 'i'},
+            **{col: 'category' for col in CATEGORICAL_COLUMNS},
+        }
+        df = df.astype({col: dtype for col, dtype in target_dtypes.items() if col in df.columns})
+        _cast_integer_columns(df)
+        
+        # NOTE: We intentionally do NOT create 'industry_sector' or 'date' columns here
+        # These are expensive operations on 4.48M rows that cause memory crashes.
+        # Instead, they are created on-demand in the visualization functions:
+        # - 'date' column: Created in show_time_series() for aggregated monthly_stats only (~24 rows)
+        # - 'industry_sector': never added as a column - _industry_sector_totals() maps each distinct
+        #   commodity code once and rolls its sums up to sectors
+        
+        return df
+        
     except Exception as e:
         # Silently fail - will fall back to GCS/CSV
         return None
 
+def _csv_reader_options(csv_path):
+    """Arrow CSV options shared by every CSV read
+    Arrow parses 16MB blocks in parallel across cores with the column types fixed up front,
+    and only materializes the DASHBOARD_COLUMNS the file has - the remaining columns are tokenized
+    but never converted. Absent ones are left out rather than failing the read, so main() can
+    report them by name
+    """
+    with open(csv_path, newline='', encoding='utf-8-sig') as csv_file:
+        header = next(csv.reader(csv_file), [])
+    read_options = pa_csv.ReadOptions(block_size=16 << 20, use_threads=True)
+    convert_options = pa_csv.ConvertOptions(
+        column_types=CSV_COLUMN_TYPES,
+        include_columns=[col for col in DASHBOARD_COLUMNS if col in header],
+        # Blank text cells load as missing (as with pd.read_csv), not as a '' category
+        strings_can_be_null=True
+    )
+    return read_options, convert_options
+
+def _cast_integer_columns(df):
+    """Narrow the integer DTYPES columns (year, month_number) in place
+    A column without missing values gets its compact int type; one with gaps is left as float64
+    (what pd.read_csv produced), since the int types cannot hold NaN
+    """
+    for col, dtype in DTYPES.items():
+        if col not in df.columns or np.dtype(dtype).kind != 'i' or df[col].dtype == dtype:
+            continue
+        values = pd.to_numeric(df[col], errors='coerce')
+        df[col] = values.astype(dtype) if values.notna().all() else values.astype('float64')
+
+def _ensure_parquet(csv_path, parquet_path=None):
+    """Return the path of a zstd Parquet copy of csv_path (default: a sibling .parquet file),
+    writing it first if it is missing or older than the CSV. Falls back to csv_path if the
+    copy cannot be written (e.g. read-only filesystem), so callers can always load whatever path is returned
+    """
+    if parquet_path is None:
+        parquet_path = os.path.splitext(csv_path)[0] + '.parquet'
+    try:
+        if os.path.exists(parquet_path) and os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path):
+            return parquet_path
+        
+        parquet_dir = os.path.dirname(parquet_path) or '.'
+        os.makedirs(parquet_dir, exist_ok=True)
+        # Stream the CSV into a temp file of this call's own (unique name, same directory), then
+        # swap it into place - sessions converting the same CSV at once never share a temp file,
+        # and readers only ever see a complete Parquet file
+        tmp_fd, tmp_path = tempfile.mkstemp(dir=parquet_dir, suffix='.parquet')
+        os.close(tmp_fd)
+        read_options, convert_options = _csv_reader_options(csv_path)
+        reader = pa_csv.open_csv(csv_path, read_options=read_options, convert_options=convert_options)
+        with pq.ParquetWriter(tmp_path, reader.schema, compression='zstd') as writer:
+            for batch in reader:
+                writer.write_batch(batch)
+        os.replace(tmp_path, parquet_path)
+        return parquet_path
+    except Exception:
+        if 'tmp_path' in locals() and os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        return csv_path
+
+def _gcs_cache_path(file_name, generation):
+    """Local Parquet cache path for one generation (upload) of a GCS object"""
+    base_name = os.path.splitext(os.path.basename(file_name))[0]
+    return os.path.join(GCS_CACHE_DIR, f"{base_name}-{generation}.parquet")
+
+def _remove_stale_gcs_caches(cache_path):
+    """Delete cached Parquet copies of earlier generations of the same object"""
+    prefix = os.path.basename(cache_path).rsplit('-', 1)[0] + '-'
+    try:
+        for name in os.listdir(GCS_CACHE_DIR):
+            path = os.path.join(GCS_CACHE_DIR, name)
+            if name.startswith(prefix) and name.endswith('.parquet') and path != cache_path:
+                os.unlink(path)
+    except OSError:
+        pass
+
 def load_data_from_file(file_path, max_rows=None):
-    """Load and process data from a CSV file with memory optimization
+    """Load and process data from a CSV or Parquet file with memory optimization
     
     Args:
-        file_path: Path to CSV file
+        file_path: Path to CSV or Parquet file (Parquet only materializes DASHBOARD_COLUMNS)
         max_rows: Maximum number of rows to load (None = load all, use for large datasets)
     """
-    chunk_size = 100000
-    chunks = []
-    total_rows = 0
-    batch_size = 3  # Reduced from 5 to combine more frequently and use less memory
-    
     try:
-        # Load data in chunks
-        chunks_to_load = None
-        if max_rows:
-            # Calculate how many chunks we need
-            chunks_to_load = (max_rows // chunk_size) + 1
+        if file_path.endswith('.parquet'):
+            parquet_file = pq.ParquetFile(file_path)
+            columns = [col for col in DASHBOARD_COLUMNS if col in parquet_file.schema_arrow.names]
+            schema = pa.schema([parquet_file.schema_arrow.field(col) for col in columns])
+            if max_rows:
+                batch_source = parquet_file.iter_batches(columns=columns)
+            else:
+                table = parquet_file.read(columns=columns, use_threads=True)
+        else:
+            read_options, convert_options = _csv_reader_options(file_path)
+            if max_rows:
+                batch_source = pa_csv.open_csv(file_path, read_options=read_options, convert_options=convert_options)
+                schema = batch_source.schema
+            else:
+                table = pa_csv.read_csv(file_path, read_options=read_options, convert_options=convert_options)
         
-        for i, chunk in enumerate(pd.read_csv(file_path, chunksize=chunk_size, low_memory=False), 1):
-            # Check if we've reached the max_rows limit
-            if max_rows and total_rows >= max_rows:
-                break
-            
-            # Stop if we've loaded enough chunks (approximate limit)
-            if chunks_to_load and i > chunks_to_load:
-                # Take only what we need from this chunk
-                if max_rows:
-                    remaining = max_rows - total_rows
-                    if remaining > 0:
-                        chunk = chunk.head(remaining)
-                    else:
-                        break
-                else:
+        if max_rows:
+            # Stream batches and stop as soon as enough rows have been read
+            batches = []
+            total_rows = 0
+            for batch in batch_source:
+                batches.append(batch)
+                total_rows += batch.num_rows
+                if total_rows >= max_rows:
                     break
-            
-            # Optimize data types immediately to reduce memory
-            try:
-                if 'year' in chunk.columns:
-                    chunk['year'] = pd.to_numeric(chunk['year'], downcast='integer', errors='coerce')
-                if 'month_number' in chunk.columns:
-                    chunk['month_number'] = pd.to_numeric(chunk['month_number'], downcast='integer', errors='coerce')
-                
-                # Optimize float columns
-                float_cols = ['valuecif', 'valuefob', 'weight', 'quantity']
-                for col in float_cols:
-                    if col in chunk.columns:
-                        chunk[col] = pd.to_numeric(chunk[col], downcast='float', errors='coerce')
-            except Exception as opt_error:
-                # If optimization fails, continue with chunk as-is
-                pass
-            
-            chunks.append(chunk)
-            total_rows += len(chunk)
-            
-            # If we've reached max_rows, stop
-            if max_rows and total_rows >= max_rows:
-                break
-            
-            # Combine chunks periodically to avoid memory spikes
-            if len(chunks) >= batch_size:
-                if 'df' not in locals():
-                    df = pd.concat(chunks, ignore_index=True)
-                else:
-                    # Combine batch at once (more efficient than incremental)
-                    batch_df = pd.concat(chunks, ignore_index=True)
-                    df = pd.concat([df, batch_df], ignore_index=True)
-                    del batch_df  # Free memory immediately
-                chunks = []
-                import gc
-                gc.collect()
+            table = pa.Table.from_batches(batches, schema=schema).slice(0, max_rows)
+            del batches
         
-        # Combine remaining chunks - use batch approach for efficiency
-        if chunks:
-            if 'df' not in locals():
-                # No df exists - combine all chunks at once (should be fine if < batch_size)
-                df = pd.concat(chunks, ignore_index=True)
-            else:
-                # df exists - combine remaining chunks in one batch
-                if len(chunks) > 0:
-                    batch_df = pd.concat(chunks, ignore_index=True)
-                    df = pd.concat([df, batch_df], ignore_index=True)
-                    del batch_df  # Free memory immediately
-            # Final cleanup
-            import gc
-            gc.collect()
+        # Convert column by column, releasing Arrow buffers as they are consumed
+        df = table.to_pandas(split_blocks=True, self_destruct=True)
+        del table
+        _cast_integer_columns(df)
         
-        # Final memory optimization
-        import gc
-        gc.collect()
+        # Arrow dictionaries list values in order of first appearance; sort them so categorical
+        # groupby/unstack output keeps the alphabetical order the charts had with plain strings
+        for col in df.select_dtypes('category').columns:
+            categories = df[col].cat.categories
+            if not categories.is_monotonic_increasing:
+                df[col] = df[col].cat.reorder_categories(categories.sort_values())
         
         # NOTE: We intentionally do NOT create 'industry_sector' or 'date' columns here
         # These are expensive operations on 4.48M rows that cause memory crashes.
         # Instead, they are created on-demand in the visualization functions:
         # - 'date' column: Created in show_time_series() for aggregated monthly_stats only (~24 rows)
-        # - 'industry_sector' column: Created in show_value_volume_analysis() and show_commodity_analysis()
-        #   using optimized approaches (unique codes mapping)
+        # - 'industry_sector': never added as a column - _industry_sector_totals() maps each distinct
+        #   commodity code once and rolls its sums up to sectors
         
         return df
     
@@ -804,7 +805,8 @@ def load_data():
     if os.path.exists(data_path):
         try:
             max_rows = _get_max_rows_limit()
-            return load_data_from_file(data_path, max_rows=max_rows)
+            # Read the columnar Parquet copy (converted once per CSV change) instead of re-parsing the CSV
+            return load_data_from_file(_ensure_parquet(data_path), max_rows=max_rows)
         except Exception:
             # Silently fail - let non-cached function handle GCS
             return None
@@ -859,7 +861,7 @@ def load_data_with_fallback():
                     pass  # Silent loading
                     
                     # Try with a reasonable limit first
-                    bigquery_data = query_bigquery(filters=None, limit_rows=2000000)
+                    bigquery_data = query_bigquery(filters=None, limit_rows=2000000, columns=DASHBOARD_COLUMNS)
                     
                     if bigquery_data is not None and len(bigquery_data) > 0:
                         st.success(f"Loaded {len(bigquery_data):,} rows from BigQuery!")
@@ -917,6 +919,59 @@ def load_data_with_fallback():
     
     return None
 
+def _cat_isin(series, values):
+    """Numpy boolean mask equivalent to series.isin(values)
+    Categorical columns are matched on their small integer codes instead of the string values
+    """
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        return series.isin(values).to_numpy()
+    target_codes = series.cat.categories.get_indexer(values)
+    target_codes = target_codes[target_codes >= 0]
+    return np.isin(series.cat.codes.to_numpy(), target_codes)
+
+def _column_total(series):
+    """Total of a float32 value column, accumulated in float64
+    Storage stays float32 to halve the bytes every scan moves; AUD totals run into the
+    hundreds of billions, past what a float32 accumulator holds exactly
+    """
+    return float(np.nansum(series.to_numpy(), dtype=np.float64))
+
+# Fingerprints already taken, by frame identity: id -> (weakref to the frame, key)
+_FRAME_KEYS = {}
+
+def _frame_key(df):
+    """Cheap cache key for DataFrame arguments of cached helpers
+    Hashing the contents of a multi-million-row frame takes seconds; the row count,
+    columns and CIF total are enough to tell loaded datasets and filter results apart.
+    The CIF total is still a full-column pass, so it is taken once per frame object - a
+    rerun makes dozens of cached calls on the same filtered frame
+    """
+    shape = (len(df), tuple(df.columns))
+    entry = _FRAME_KEYS.get(id(df))
+    # The weakref guards against a recycled id; the shape check against columns added in place
+    if entry is not None and entry[0]() is df and entry[1][:2] == shape:
+        return entry[1]
+    value_total = _column_total(df['valuecif']) if 'valuecif' in df.columns else None
+    key = shape + (value_total,)
+    frame_id = id(df)
+    _FRAME_KEYS[frame_id] = (weakref.ref(df, lambda _ref: _FRAME_KEYS.pop(frame_id, None)), key)
+    return key
+
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: _frame_key}, max_entries=8)
+def _value_totals(df):
+    """Float64 totals of the FOB, CIF and weight columns, computed once per frame and shared by every section"""
+    return {col: _column_total(df[col]) for col in ('valuefob', 'valuecif', 'weight')}
+
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: _frame_key}, max_entries=4)
+def _filter_catalog(df):
+    """Sidebar filter options for a loaded dataset: years, months and the top 20 countries by CIF value"""
+    return {
+        # Exact unique over int16 / categorical codes - never misses a rare year or month
+        'years': sorted(df['year'].dropna().unique()),
+        'months': sorted(df['month'].dropna().unique()),
+        'top_countries': df.groupby('country_description', observed=True, sort=False)['valuecif'].sum().nlargest(20).index.tolist(),
+    }
+
 def main():
     """Main dashboard application"""
     
@@ -948,27 +1003,31 @@ def main():
         st.warning("No data available. Please configure data source or upload a file.")
         return
     
+    # Loaders project to DASHBOARD_COLUMNS and every section reads from that set - catch a
+    # source that lacks one here rather than part-way down the page
+    missing_columns = [col for col in DASHBOARD_COLUMNS if col not in df.columns]
+    if missing_columns:
+        st.error(f"Loaded data is missing required columns: {', '.join(missing_columns)}")
+        return
+    
     # Sidebar filters
     st.sidebar.header("Filters")
     
-    # Year filter - optimize for large datasets
+    # Filter options (cached per dataset, so reruns skip the scans and the country groupby)
     try:
-        # Years have very few unique values, so sample efficiently
-        if len(df) > 2000000:
-            # Sample a smaller subset to get unique years
-            sample_size = min(100000, len(df))
-            sample_indices = np.random.choice(df.index, size=sample_size, replace=False)
-            available_years = sorted(df.loc[sample_indices, 'year'].dropna().unique())
-            # Also check if we missed any years by checking the full range
-            # But this is unlikely since years are limited (2024, 2025)
-        else:
-            available_years = sorted(df['year'].dropna().unique())
-        # Limit default selection to prevent memory issues
-        default_years = available_years if len(available_years) <= 5 else available_years[-2:]
+        catalog = _filter_catalog(df)
+        available_years = catalog['years']
+        available_months = catalog['months']
+        top_countries = catalog['top_countries']
     except Exception as e:
-        st.warning(f"Error getting years: {str(e)}")
+        st.warning(f"Error building filter options: {str(e)}")
         available_years = []
-        default_years = []
+        available_months = []
+        top_countries = []
+    
+    # Limit default year selection to prevent memory issues
+    default_years = available_years if len(available_years) <= 5 else available_years[-2:]
+    default_months = available_months
     
     selected_years = st.sidebar.multiselect(
         "Select Years",
@@ -976,43 +1035,12 @@ def main():
         default=default_years if default_years else available_years
     )
     
-    # Month filter - optimize for large datasets
-    try:
-        # Months have limited unique values (12), so sample efficiently
-        if len(df) > 2000000:
-            # Sample a smaller subset to get unique months
-            sample_size = min(100000, len(df))
-            sample_indices = np.random.choice(df.index, size=sample_size, replace=False)
-            available_months = sorted(df.loc[sample_indices, 'month'].dropna().unique())
-        else:
-            available_months = sorted(df['month'].dropna().unique())
-        default_months = available_months if len(available_months) <= 12 else available_months
-    except Exception as e:
-        st.warning(f"Error getting months: {str(e)}")
-        available_months = []
-        default_months = []
-    
     selected_months = st.sidebar.multiselect(
         "Select Months",
         options=available_months,
         default=default_months
     )
     
-    # Country filter - optimize for large datasets
-    try:
-        # For large datasets, sample first to get top countries faster
-        if len(df) > 1000000:
-            # Sample 500K rows for faster groupby (use iloc for faster sampling)
-            sample_size = min(500000, len(df))
-            sample_indices = np.random.choice(df.index, size=sample_size, replace=False)
-            df_sample = df.loc[sample_indices]
-            top_countries = df_sample.groupby('country_description')['valuecif'].sum().sort_values(ascending=False).head(20).index.tolist()
-        else:
-            top_countries = df.groupby('country_description')['valuecif'].sum().sort_values(ascending=False).head(20).index.tolist()
-    except Exception as e:
-        st.warning(f"Error getting top countries: {str(e)}")
-        top_countries = []
-    
     selected_countries = st.sidebar.multiselect(
         "Select Countries (Top 20)",
         options=top_countries,
@@ -1020,34 +1048,37 @@ def main():
     )
     
     # Apply filters using mask-based approach (memory efficient)
-    # Build boolean mask instead of copying dataframe
-    mask = pd.Series(True, index=df.index)
-    
-    if selected_years:
-        mask = mask & df['year'].isin(selected_years)
-    if selected_months:
-        mask = mask & df['month'].isin(selected_months)
+    # Build a plain numpy boolean mask instead of copying dataframe
+    # A filter that keeps every option (the default month selection, or all years) excludes
+    # nothing, so skip its full-column scan
+    mask = np.ones(len(df), dtype=bool)
+    
+    if selected_years and len(selected_years) < len(available_years):
+        mask &= df['year'].isin(selected_years).to_numpy()
+    if selected_months and len(selected_months) < len(available_months):
+        mask &= _cat_isin(df['month'], selected_months)
     if selected_countries:
-        mask = mask & df['country_description'].isin(selected_countries)
-    
-    # Only create filtered dataframe at the end (single copy)
-    # Check if any filters were applied
-    filters_applied = len(selected_years) < len(available_years) or len(selected_months) < len(available_months) or len(selected_countries) > 0
+        mask &= _cat_isin(df['country_description'], selected_countries)
     
-    if filters_applied:
-        # Filters applied - create filtered dataframe
-        df_filtered = df[mask].copy()
+    if not mask.all():
+        # Filters exclude rows - boolean indexing already allocates the result, so no extra .copy()
+        df_filtered = df[mask]
     else:
-        # No filters - use original dataframe (no copy needed)
+        # No rows excluded - use original dataframe (no copy needed)
         # But warn if dataset is very large
         if len(df) > 3000000:
             st.warning(f"⚠️ Large dataset ({len(df):,} rows) loaded. Consider using filters to improve performance.")
         df_filtered = df
     
     # Log memory usage for debugging
+    # deep=True is only cheap while every text column is categorical (it then sizes just the categories);
+    # a plain object/str column would make it visit every string, so fall back to the buffer sizes
     try:
-        memory_mb = df_filtered.memory_usage(deep=True).sum() / (1024**2)
-        st.sidebar.info(f"Filtered: {len(df_filtered):,} rows ({memory_mb:.1f} MB)")
+        text_columns = [col for col, dtype in df_filtered.dtypes.items()
+                        if not isinstance(dtype, pd.CategoricalDtype) and dtype.kind not in 'biufcmM']
+        memory_mb = df_filtered.memory_usage(deep=not text_columns).sum() / (1024**2)
+        approx = "~" if text_columns else ""
+        st.sidebar.info(f"Filtered: {len(df_filtered):,} rows ({approx}{memory_mb:.1f} MB)")
     except:
         pass
     
@@ -1170,31 +1201,184 @@ def main():
         with st.expander("Show error details"):
             st.code(traceback.format_exc())
 
-def _optimize_groupby_for_large_df(df, groupby_cols, agg_dict, sample_size=2000000):
-    """Helper function to optimize groupby operations for large datasets"""
-    if len(df) == 0:
-        return pd.DataFrame()
+# Keys and value columns of the pre-aggregated fact cube shared by the section aggregations
+FACT_CUBE_KEYS = ['year', 'month_number', 'month', 'country_description', 'commodity_description']
+FACT_CUBE_VALUES = ['valuefob', 'valuecif', 'weight', 'quantity']
+# Per-key totals spec shared by every section - a key asked for by several sections (country,
+# commodity, mode, state, year) is then aggregated once and served from one cache entry
+VALUE_TOTALS = {col: 'sum' for col in FACT_CUBE_VALUES}
+
+# With thousands of commodities the cube can approach the frame's own row count, so only the
+# current filter's cube and the previous one are held, and idle ones expire
+@st.cache_resource(show_spinner=False, hash_funcs={pd.DataFrame: _frame_key}, max_entries=2, ttl=600)
+def _fact_cube(df):
+    """Sum the value columns over every year/month/country/commodity combination present
+    Built once per frame; sums over any subset of these keys can then be regrouped from the
+    cube instead of the full frame. Rows with a missing key are kept as their own cube rows
+    (dropna=False), so a regroup over the other keys still counts them.
+    Held as a shared resource (read-only) so it is not copied per call
+    """
+    return df.groupby(FACT_CUBE_KEYS, as_index=False, observed=True, sort=False,
+                      dropna=False)[FACT_CUBE_VALUES].sum()
+
+def _sum_by_codes(df, key, value_columns):
+    """Per-category sums for one categorical key with np.bincount over its integer codes
+    Same rows and order as groupby(key, observed=True).sum() - observed categories in
+    category order, missing keys and NaN values skipped - with the sums accumulated in float64
+    """
+    codes = df[key].cat.codes.to_numpy()
+    valid = codes >= 0
+    if not valid.all():
+        codes = codes[valid]
+    n_categories = len(df[key].cat.categories)
+    observed = np.flatnonzero(np.bincount(codes, minlength=n_categories))
+    result = {key: pd.Categorical.from_codes(observed, dtype=df[key].dtype)}
+    for col in value_columns:
+        values = np.nan_to_num(df[col].to_numpy(dtype=np.float64)[valid])
+        result[col] = np.bincount(codes, weights=values, minlength=n_categories)[observed]
+    return pd.DataFrame(result)
+
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: _frame_key}, max_entries=128)
+def _cached_groupby(df, by, agg_dict):
+    """Exact groupby-aggregate, cached per (frame fingerprint, keys, aggregations)
+    Reruns with unchanged filters (scrolling, widget interactions elsewhere) reuse the small
+    result instead of regrouping millions of rows. Plain sums over fact-cube keys are
+    regrouped from the cube
+    """
+    keys = [by] if isinstance(by, str) else list(by)
+    cube_columns = FACT_CUBE_KEYS + FACT_CUBE_VALUES
+    if (set(keys) <= set(FACT_CUBE_KEYS)
+            and all(col in FACT_CUBE_VALUES and func == 'sum' for col, func in agg_dict.items())
+            and all(col in df.columns for col in cube_columns)):
+        df = _fact_cube(df)
+    if (len(keys) == 1 and isinstance(df[keys[0]].dtype, pd.CategoricalDtype)
+            and all(func == 'sum' for func in agg_dict.values())):
+        return _sum_by_codes(df, keys[0], list(agg_dict))
+    return df.groupby(by, as_index=False, observed=True).agg(agg_dict)
+
+def _truncate_labels(series, max_len=75):
+    """Shorten long category labels for chart axes, marking cut text with '...'"""
+    labels = series.astype(str)
+    return labels.where(labels.str.len() <= max_len, labels.str[:max_len] + '...')
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def _bar_figure_json(data_frame=None, traces=None, layout=None, **px_kwargs):
+    """Build a px.bar figure and return it serialised to JSON
+    Keyed on the small chart frame and the chart options, so a rerun that leaves a chart's
+    inputs unchanged skips the Plotly Express build and only rehydrates the figure
+    """
+    fig = px.bar(data_frame, **px_kwargs)
+    if traces:
+        fig.update_traces(**traces)
+    if layout:
+        fig.update_layout(**layout)
+    return fig.to_json()
+
+def _chart_data(data_frame, px_kwargs):
+    """Cut a chart frame down to the columns a px call references, as plain arrays/lists
+    Plotly Express then skips its DataFrame introspection, and the figure cache hashes only
+    what is drawn (not the full category lists of categorical columns). Text goes in as lists:
+    Streamlit would hash an object array by its pointers
+    """
+    referenced = set()
+    for value in px_kwargs.values():
+        if isinstance(value, str):
+            referenced.add(value)
+        elif isinstance(value, (list, tuple, dict)):
+            referenced.update(item for item in value if isinstance(item, str))
+    return {
+        col: data_frame[col].to_numpy() if data_frame[col].dtype.kind in 'biuf' else data_frame[col].tolist()
+        for col in data_frame.columns if col in referenced
+    }
+
+def _plot_bar(data_frame=None, traces=None, layout=None, **px_kwargs):
+    """Render a (cached) px.bar figure at full width"""
+    if data_frame is not None:
+        data_frame = _chart_data(data_frame, px_kwargs)
+    fig_json = _bar_figure_json(data_frame, traces=traces, layout=layout, **px_kwargs)
+    st.plotly_chart(pio.from_json(fig_json), width='stretch')
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _monthly_trends_figure_json(dates, fob, cif, weight, quantity):
+    """Build the 2x2 monthly trends figure and return it serialised to JSON
+    Keyed on the monthly series only (about 24 points each), like _bar_figure_json
+    """
+    # Create subplots
+    fig = make_subplots(
+        rows=2, cols=2,
+        subplot_titles=('Monthly FOB Value', 'Monthly CIF Value', 'Monthly Weight', 'Monthly Quantity'),
+        vertical_spacing=0.12
+    )
     
-    # Handle list vs single column
-    if isinstance(groupby_cols, str):
-        groupby_cols_list = [groupby_cols]
-    else:
-        groupby_cols_list = groupby_cols
-    
-    if len(df) > sample_size:
-        # Sample for faster groupby
-        sample_indices = np.random.choice(df.index, size=sample_size, replace=False)
-        df_sample = df.loc[sample_indices]
-        result = df_sample.groupby(groupby_cols_list).agg(agg_dict).reset_index()
-        # Scale up to approximate full dataset
-        scale_factor = len(df) / len(df_sample)
-        numeric_cols = [col for col in result.columns if col not in groupby_cols_list]
-        for col in numeric_cols:
-            if result[col].dtype in ['float64', 'int64', 'float32', 'int32']:
-                result[col] = result[col] * scale_factor
-        return result
+    # FOB Value
+    fig.add_trace(
+        go.Scatter(x=dates, y=fob/1e9,
+                   mode='lines+markers', name='FOB', line=dict(color='#1f77b4', width=2)),
+        row=1, col=1
+    )
+    
+    # CIF Value
+    fig.add_trace(
+        go.Scatter(x=dates, y=cif/1e9,
+                   mode='lines+markers', name='CIF', line=dict(color='orange', width=2)),
+        row=1, col=2
+    )
+    
+    # Weight
+    fig.add_trace(
+        go.Scatter(x=dates, y=weight/1e6,
+                   mode='lines+markers', name='Weight', line=dict(color='green', width=2)),
+        row=2, col=1
+    )
+    
+    # Quantity
+    fig.add_trace(
+        go.Scatter(x=dates, y=quantity/1e6,
+                   mode='lines+markers', name='Quantity', line=dict(color='red', width=2)),
+        row=2, col=2
+    )
+    
+    fig.update_xaxes(title_text="Month", row=2, col=1)
+    fig.update_xaxes(title_text="Month", row=2, col=2)
+    fig.update_yaxes(title_text="Value (Billions AUD)", row=1, col=1)
+    fig.update_yaxes(title_text="Value (Billions AUD)", row=1, col=2)
+    fig.update_yaxes(title_text="Weight (Millions Tonnes)", row=2, col=1)
+    fig.update_yaxes(title_text="Quantity (Millions)", row=2, col=2)
+    
+    fig.update_layout(height=800, showlegend=False, title_text="Monthly Import Trends")
+    return fig.to_json()
+
+def _scatter_matrix(row_keys, col_keys, values, row_labels, col_labels):
+    """Sum values into a dense len(row_labels) x len(col_labels) matrix
+    Keys are mapped to positions with get_indexer and accumulated with np.add.at, so no
+    MultiIndex/pivot intermediates are built; every key must appear in its label list
+    """
+    rows = pd.Index(row_labels).get_indexer(row_keys)
+    cols = pd.Index(col_labels).get_indexer(col_keys)
+    matrix = np.zeros((len(row_labels), len(col_labels)), dtype=np.float64)
+    np.add.at(matrix, (rows, cols), values)
+    return matrix
+
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: _frame_key}, max_entries=16)
+def _industry_sector_totals(df, value_columns):
+    """Sums of value_columns per SITC industry sector, as an 'industry_sector' column plus one
+    column per value. df is left unchanged (an added column would change its _frame_key and
+    invalidate every other cached aggregate of the frame). Rows are summed per distinct commodity
+    code with np.bincount in float64, and the mapping function runs once per code to roll
+    those sums up to sectors
+    """
+    codes, unique_codes = pd.factorize(df['commodity_code'], use_na_sentinel=False)
+    if COMMODITY_MAPPING_AVAILABLE:
+        sectors = pd.Series([map_commodity_code_to_sitc_industry(code) for code in unique_codes],
+                            dtype=object).fillna('Commodities Not Classified Elsewhere')
     else:
-        return df.groupby(groupby_cols_list).agg(agg_dict).reset_index()
+        sectors = pd.Series(['Unknown'] * len(unique_codes), dtype=object)
+    code_totals = pd.DataFrame({
+        col: np.bincount(codes, weights=np.nan_to_num(df[col].to_numpy(dtype=np.float64)),
+                         minlength=len(unique_codes))
+        for col in value_columns
+    })
+    return code_totals.groupby(sectors.to_numpy()).sum().rename_axis('industry_sector').reset_index()
 
 def show_overview(df):
     """Display overview metrics"""
@@ -1203,35 +1387,11 @@ def show_overview(df):
     # Key metrics - optimize for large datasets
     col1, col2, col3, col4 = st.columns(4)
     
-    # Use optimized aggregation for large datasets
-    if len(df) == 0:
-        total_fob = 0
-        total_cif = 0
-        total_weight = 0
-    elif len(df) > 2000000:
-        # Sample for faster calculations
-        sample_size = min(1000000, len(df))
-        try:
-            sample_indices = np.random.choice(df.index, size=sample_size, replace=False)
-            df_sample = df.loc[sample_indices]
-            if len(df_sample) > 0:
-                scale_factor = len(df) / len(df_sample)
-                total_fob = df_sample['valuefob'].sum() * scale_factor
-                total_cif = df_sample['valuecif'].sum() * scale_factor
-                total_weight = df_sample['weight'].sum() * scale_factor
-            else:
-                total_fob = df['valuefob'].sum()
-                total_cif = df['valuecif'].sum()
-                total_weight = df['weight'].sum()
-        except Exception:
-            # Fallback to direct sum if sampling fails
-            total_fob = df['valuefob'].sum()
-            total_cif = df['valuecif'].sum()
-            total_weight = df['weight'].sum()
-    else:
-        total_fob = df['valuefob'].sum()
-        total_cif = df['valuecif'].sum()
-        total_weight = df['weight'].sum()
+    # Exact column sums, cached per filtered frame
+    totals = _value_totals(df)
+    total_fob = totals['valuefob']
+    total_cif = totals['valuecif']
+    total_weight = totals['weight']
     
     total_records = len(df)
     
@@ -1249,31 +1409,9 @@ def show_overview(df):
     
     st.markdown("---")
     
-    # Year range - optimize for large datasets
-    if len(df) == 0:
-        year_range = "N/A"
-    elif len(df) > 2000000:
-        # Sample for min/max
-        try:
-            sample_size = min(500000, len(df))
-            sample_indices = np.random.choice(df.index, size=sample_size, replace=False)
-            df_sample = df.loc[sample_indices]
-            if len(df_sample) > 0:
-                year_min = df_sample['year'].min()
-                year_max = df_sample['year'].max()
-            else:
-                year_min = df['year'].min()
-                year_max = df['year'].max()
-        except Exception:
-            # Fallback to direct min/max if sampling fails
-            year_min = df['year'].min()
-            year_max = df['year'].max()
-    else:
-        year_min = df['year'].min()
-        year_max = df['year'].max()
-    
+    # Year range
     if len(df) > 0:
-        year_range = f"{year_min:.0f} - {year_max:.0f}"
+        year_range = f"{df['year'].min():.0f} - {df['year'].max():.0f}"
     else:
         year_range = "N/A"
     st.info(f"Date Range: {year_range}")
@@ -1282,49 +1420,32 @@ def show_overview(df):
     col1, col2 = st.columns(2)
     
     with col1:
-        # Top 5 countries - optimize for large datasets
+        # Top 5 countries - cached exact groupby on the categorical codes
         try:
-            if len(df) > 2000000:
-                # Sample for faster groupby on very large datasets
-                sample_size = min(1000000, len(df))
-                sample_indices = np.random.choice(df.index, size=sample_size, replace=False)
-                df_sample = df.loc[sample_indices]
-                top_countries = df_sample.groupby('country_description')['valuecif'].sum().sort_values(ascending=False).head(5)
-            else:
-                top_countries = df.groupby('country_description')['valuecif'].sum().sort_values(ascending=False).head(5)
+            top_countries = _cached_groupby(df, 'country_description', VALUE_TOTALS).set_index('country_description')['valuecif'].nlargest(5)
         except Exception as e:
             st.error(f"Error calculating top countries: {str(e)}")
             return
-        fig = px.bar(
+        _plot_bar(
             x=top_countries.values / 1e9,
-            y=top_countries.index,
+            y=top_countries.index.tolist(),
             orientation='h',
             title="Top 5 Countries by Import Value (CIF)",
-            labels={'x': 'Value (Billions AUD)', 'y': 'Country'}
+            labels={'x': 'Value (Billions AUD)', 'y': 'Country'},
+            layout=dict(height=400)
         )
-        fig.update_layout(height=400)
-        st.plotly_chart(fig, width='stretch')
     
     with col2:
-        # Top 5 commodities - optimize for large datasets
+        # Top 5 commodities - cached exact groupby on the categorical codes
         try:
-            if len(df) > 2000000:
-                # Sample for faster groupby on very large datasets
-                sample_size = min(1000000, len(df))
-                sample_indices = np.random.choice(df.index, size=sample_size, replace=False)
-                df_sample = df.loc[sample_indices]
-                top_commodities_df = df_sample.groupby('commodity_description')['valuecif'].sum().sort_values(ascending=False).head(5).reset_index()
-            else:
-                top_commodities_df = df.groupby('commodity_description')['valuecif'].sum().sort_values(ascending=False).head(5).reset_index()
+            top_commodities_df = _cached_groupby(df, 'commodity_description', VALUE_TOTALS).nlargest(5, 'valuecif')
         except Exception as e:
             st.error(f"Error calculating top commodities: {str(e)}")
             return
-        # Optimize string operations - use vectorized approach with NaN handling
-        top_commodities_df['commodity_label'] = top_commodities_df['commodity_description'].astype(str).str[:75] + '...'
-        mask_long = top_commodities_df['commodity_description'].astype(str).str.len() <= 75
-        top_commodities_df.loc[mask_long, 'commodity_label'] = top_commodities_df.loc[mask_long, 'commodity_description'].astype(str)
+        top_commodities_df['commodity_label'] = _truncate_labels(top_commodities_df['commodity_description'])
         top_commodities_df['value_billions'] = top_commodities_df['valuecif'] / 1e9
-        fig = px.bar(
+        # hover_data puts the full description in customdata[0] for the hover template
+        _plot_bar(
             top_commodities_df,
             x='value_billions',
             y='commodity_label',
@@ -1333,12 +1454,10 @@ def show_overview(df):
             labels={'value_billions': 'Value (Billions AUD)', 'commodity_label': 'Commodity'},
             color='value_billions',
             color_continuous_scale='Blues',
-            hover_data={'commodity_description': True, 'commodity_label': False}
+            hover_data={'commodity_description': True, 'commodity_label': False},
+            traces=dict(hovertemplate='<b>%{customdata[0]}</b><br>Value: %{x:.2f} Billion AUD<extra></extra>'),
+            layout=dict(height=400)
         )
-        fig.update_traces(hovertemplate='<b>%{customdata[0]}</b><br>Value: %{x:.2f} Billion AUD<extra></extra>',
-                          customdata=top_commodities_df[['commodity_description']].values)
-        fig.update_layout(height=400)
-        st.plotly_chart(fig, width='stretch')
 
 def show_time_series(df):
     """Display time series analysis"""
@@ -1346,17 +1465,13 @@ def show_time_series(df):
     
     # Monthly trends - optimize for large datasets
     try:
-        # Use optimized groupby helper function for better memory efficiency
-        monthly_stats = _optimize_groupby_for_large_df(
-            df,
-            ['year', 'month_number', 'month'],
-            {
-                'valuefob': 'sum',
-                'valuecif': 'sum',
-                'weight': 'sum',
-                'quantity': 'sum'
-            }
-        )
+        # Exact groupby - observed=True keeps categorical keys to the combinations present
+        monthly_stats = _cached_groupby(df, ['year', 'month_number', 'month'], {
+            'valuefob': 'sum',
+            'valuecif': 'sum',
+            'weight': 'sum',
+            'quantity': 'sum'
+        })
     except Exception as e:
         st.error(f"Error calculating time series: {str(e)}")
         import traceback
@@ -1365,71 +1480,27 @@ def show_time_series(df):
         return
     
     monthly_stats = monthly_stats.sort_values(['year', 'month_number'])
-    monthly_stats['date'] = pd.to_datetime(
-        monthly_stats['year'].astype(str) + '-' + 
-        monthly_stats['month_number'].astype(str).str.zfill(2) + '-01'
-    )
-    
-    # Create subplots
-    fig = make_subplots(
-        rows=2, cols=2,
-        subplot_titles=('Monthly FOB Value', 'Monthly CIF Value', 'Monthly Weight', 'Monthly Quantity'),
-        vertical_spacing=0.12
-    )
-    
-    # FOB Value
-    fig.add_trace(
-        go.Scatter(x=monthly_stats['date'], y=monthly_stats['valuefob']/1e9,
-                   mode='lines+markers', name='FOB', line=dict(color='#1f77b4', width=2)),
-        row=1, col=1
+    monthly_stats['date'] = pd.to_datetime({
+        'year': monthly_stats['year'],
+        'month': monthly_stats['month_number'],
+        'day': 1
+    })
+    
+    fig_json = _monthly_trends_figure_json(
+        monthly_stats['date'].to_numpy(),
+        monthly_stats['valuefob'].to_numpy(),
+        monthly_stats['valuecif'].to_numpy(),
+        monthly_stats['weight'].to_numpy(),
+        monthly_stats['quantity'].to_numpy(),
     )
-    
-    # CIF Value
-    fig.add_trace(
-        go.Scatter(x=monthly_stats['date'], y=monthly_stats['valuecif']/1e9,
-                   mode='lines+markers', name='CIF', line=dict(color='orange', width=2)),
-        row=1, col=2
-    )
-    
-    # Weight
-    fig.add_trace(
-        go.Scatter(x=monthly_stats['date'], y=monthly_stats['weight']/1e6,
-                   mode='lines+markers', name='Weight', line=dict(color='green', width=2)),
-        row=2, col=1
-    )
-    
-    # Quantity
-    fig.add_trace(
-        go.Scatter(x=monthly_stats['date'], y=monthly_stats['quantity']/1e6,
-                   mode='lines+markers', name='Quantity', line=dict(color='red', width=2)),
-        row=2, col=2
-    )
-    
-    fig.update_xaxes(title_text="Month", row=2, col=1)
-    fig.update_xaxes(title_text="Month", row=2, col=2)
-    fig.update_yaxes(title_text="Value (Billions AUD)", row=1, col=1)
-    fig.update_yaxes(title_text="Value (Billions AUD)", row=1, col=2)
-    fig.update_yaxes(title_text="Weight (Millions Tonnes)", row=2, col=1)
-    fig.update_yaxes(title_text="Quantity (Millions)", row=2, col=2)
-    
-    fig.update_layout(height=800, showlegend=False, title_text="Monthly Import Trends")
-    st.plotly_chart(fig, width='stretch')
+    st.plotly_chart(pio.from_json(fig_json), width='stretch')
     
     # Year-over-Year comparison - optimize for large datasets
     st.subheader("Year-over-Year Comparison")
     
     try:
-        # Use optimized groupby helper function for better memory efficiency
-        yearly_stats = _optimize_groupby_for_large_df(
-            df,
-            'year',
-            {
-                'valuefob': 'sum',
-                'valuecif': 'sum',
-                'weight': 'sum',
-                'quantity': 'sum'
-            }
-        )
+        # Exact groupby - observed=True keeps categorical keys to the combinations present
+        yearly_stats = _cached_groupby(df, 'year', VALUE_TOTALS)
     except Exception as e:
         st.error(f"Error calculating yearly stats: {str(e)}")
         import traceback
@@ -1441,17 +1512,16 @@ def show_time_series(df):
         col1, col2 = st.columns(2)
         
         with col1:
-            fig = px.bar(
+            _plot_bar(
                 yearly_stats,
                 x='year',
                 y=['valuefob', 'valuecif'],
                 barmode='group',
                 title="Year-over-Year Comparison: FOB vs CIF",
                 labels={'value': 'Value (AUD)', 'year': 'Year'},
-                color_discrete_map={'valuefob': '#1f77b4', 'valuecif': 'orange'}
+                color_discrete_map={'valuefob': '#1f77b4', 'valuecif': 'orange'},
+                layout=dict(yaxis_title="Value (AUD)")
             )
-            fig.update_layout(yaxis_title="Value (AUD)")
-            st.plotly_chart(fig, width='stretch')
         
         with col2:
             # Growth rates
@@ -1485,24 +1555,18 @@ def show_geographic_analysis(df):
     st.subheader("Top Countries by Import Value")
     
     try:
-        country_stats = _optimize_groupby_for_large_df(
-            df, 
-            'country_description', 
-            {'valuecif': 'sum', 'weight': 'sum'}
-        ).sort_values('valuecif', ascending=False)
+        country_stats = _cached_groupby(df, 'country_description', VALUE_TOTALS).sort_values('valuecif', ascending=False)
     except Exception as e:
         st.error(f"Error calculating country stats: {str(e)}")
         return
     
-    country_stats['valuecif_pct'] = (country_stats['valuecif'] / country_stats['valuecif'].sum()) * 100
-    
     top_n = st.slider("Select number of top countries", 5, 30, 15)
     
     col1, col2 = st.columns(2)
     
     with col1:
         top_countries = country_stats.head(top_n)
-        fig = px.bar(
+        _plot_bar(
             top_countries,
             x='valuecif',
             y='country_description',
@@ -1510,14 +1574,13 @@ def show_geographic_analysis(df):
             title=f"Top {top_n} Countries by CIF Value",
             labels={'valuecif': 'Value (AUD)', 'country_description': 'Country'},
             color='valuecif',
-            color_continuous_scale='Blues'
+            color_continuous_scale='Blues',
+            layout=dict(yaxis={'categoryorder': 'total ascending'}, height=600)
         )
-        fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=600)
-        st.plotly_chart(fig, width='stretch')
     
     with col2:
         top_countries_weight = country_stats.nlargest(top_n, 'weight')
-        fig = px.bar(
+        _plot_bar(
             top_countries_weight,
             x='weight',
             y='country_description',
@@ -1525,18 +1588,26 @@ def show_geographic_analysis(df):
             title=f"Top {top_n} Countries by Weight",
             labels={'weight': 'Weight (Tonnes)', 'country_description': 'Country'},
             color='weight',
-            color_continuous_scale='Oranges'
+            color_continuous_scale='Oranges',
+            layout=dict(yaxis={'categoryorder': 'total ascending'}, height=600)
         )
-        fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=600)
-        st.plotly_chart(fig, width='stretch')
     
     # Port Analysis
     st.subheader("Port Analysis")
     
-    # Australian Ports - optimize for large datasets
+    # Ports and states - one pass over the frame builds the port x country x state x origin port
+    # rollup; the Australian and origin port totals, the state totals, the heatmap and the
+    # concentration analysis below are all regrouped from that small frame
     try:
-        ausport_stats = _optimize_groupby_for_large_df(
-            df, 'ausport_description', {'valuecif': 'sum', 'weight': 'sum'}
+        port_rollup = _cached_groupby(
+            df, ['ausport_description', 'country_description', 'state', 'osport_description'],
+            {'valuecif': 'sum', 'weight': 'sum'}
+        )
+        port_country_full = port_rollup.groupby(
+            ['ausport_description', 'country_description'], as_index=False, observed=True, sort=False
+        ).agg({'valuecif': 'sum', 'weight': 'sum'})
+        ausport_stats = port_country_full.groupby('ausport_description', as_index=False, observed=True, sort=False).agg(
+            {'valuecif': 'sum', 'weight': 'sum'}
         ).sort_values('valuecif', ascending=False)
     except Exception as e:
         st.error(f"Error calculating port stats: {str(e)}")
@@ -1546,7 +1617,7 @@ def show_geographic_analysis(df):
     
     with col1:
         top_ports = ausport_stats.head(15)
-        fig = px.bar(
+        _plot_bar(
             top_ports,
             x='valuecif',
             y='ausport_description',
@@ -1554,23 +1625,20 @@ def show_geographic_analysis(df):
             title="Top 15 Australian Ports by CIF Value",
             labels={'valuecif': 'Value (AUD)', 'ausport_description': 'Port'},
             color='valuecif',
-            color_continuous_scale='Purples'
+            color_continuous_scale='Purples',
+            layout=dict(yaxis={'categoryorder': 'total ascending'}, height=500)
         )
-        fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=500)
-        st.plotly_chart(fig, width='stretch')
     
     with col2:
         # Origin Ports - optimize for large datasets
         try:
-            osport_stats = _optimize_groupby_for_large_df(
-                df, 'osport_description', {'valuecif': 'sum', 'weight': 'sum'}
-            ).sort_values('valuecif', ascending=False)
+            osport_stats = _sum_by_codes(port_rollup, 'osport_description', ['valuecif', 'weight']).sort_values('valuecif', ascending=False)
         except Exception as e:
             st.error(f"Error calculating origin port stats: {str(e)}")
             return
         
         top_osports = osport_stats.head(15)
-        fig = px.bar(
+        _plot_bar(
             top_osports,
             x='valuecif',
             y='osport_description',
@@ -1578,24 +1646,19 @@ def show_geographic_analysis(df):
             title="Top 15 Origin Ports by CIF Value",
             labels={'valuecif': 'Value (AUD)', 'osport_description': 'Port'},
             color='valuecif',
-            color_continuous_scale='Greens'
+            color_continuous_scale='Greens',
+            layout=dict(yaxis={'categoryorder': 'total ascending'}, height=500)
         )
-        fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=500)
-        st.plotly_chart(fig, width='stretch')
     
     # State Analysis
     st.subheader("Import Value by State")
     
     try:
-        state_stats = _optimize_groupby_for_large_df(
-            df, 'state', {'valuecif': 'sum'}
-        ).sort_values('valuecif', ascending=False)
+        state_stats = _sum_by_codes(port_rollup, 'state', ['valuecif']).sort_values('valuecif', ascending=False)
     except Exception as e:
         st.error(f"Error calculating state stats: {str(e)}")
         return
     
-    state_stats['valuecif_pct'] = (state_stats['valuecif'] / state_stats['valuecif'].sum()) * 100
-    
     fig = px.bar(
         state_stats,
         x='state',
@@ -1615,54 +1678,30 @@ def show_geographic_analysis(df):
     top_15_countries = country_stats.head(15)['country_description'].tolist()
     
     try:
-        # For large datasets, sample before filtering
-        if len(df) > 2000000:
-            sample_size = min(1000000, len(df))
-            sample_indices = np.random.choice(df.index, size=sample_size, replace=False)
-            df_sample = df.loc[sample_indices]
-            # Apply mask to sampled dataframe
-            port_mask = df_sample['ausport_description'].isin(top_10_ports) & df_sample['country_description'].isin(top_15_countries)
-            port_country_data = df_sample[port_mask]
-            scale_factor = len(df) / len(df_sample)
-        else:
-            # Use mask-based filtering instead of copying
-            port_mask = df['ausport_description'].isin(top_10_ports) & df['country_description'].isin(top_15_countries)
-            port_country_data = df[port_mask]
-            scale_factor = 1.0
-        
-        port_country_matrix = _optimize_groupby_for_large_df(
-            port_country_data, ['ausport_description', 'country_description'], {'valuecif': 'sum'}
-        )
-        
-        # Scale up if sampled
-        if scale_factor != 1.0:
-            port_country_matrix['valuecif'] = port_country_matrix['valuecif'] * scale_factor
+        # Select the top ports/countries from the already-aggregated matrix instead of re-scanning the frame
+        port_mask = (port_country_full['ausport_description'].isin(top_10_ports)
+                     & port_country_full['country_description'].isin(top_15_countries))
+        port_country_matrix = port_country_full.loc[port_mask, ['ausport_description', 'country_description', 'valuecif']]
     except Exception as e:
         st.error(f"Error calculating port-country matrix: {str(e)}")
         return
     
-    # Use unstack instead of pivot_table for better memory efficiency
-    # Handle potential duplicate indices by aggregating first
-    try:
-        port_country_indexed = port_country_matrix.set_index(['ausport_description', 'country_description'])['valuecif']
-        # Check for duplicates and aggregate if needed
-        if port_country_indexed.index.duplicated().any():
-            port_country_indexed = port_country_indexed.groupby(level=[0, 1]).sum()
-        port_country_pivot = port_country_indexed.unstack(fill_value=0) / 1e9  # Convert to billions
-    except Exception as e:
-        # Fallback to pivot_table if unstack fails
-        port_country_pivot = port_country_matrix.pivot_table(
-            index='ausport_description',
-            columns='country_description',
-            values='valuecif',
-            fill_value=0
-        ) / 1e9
+    # Dense port x country matrix by scatter-adding onto positional codes - no pivot intermediates
+    heatmap_ports = sorted(port_country_matrix['ausport_description'].unique())
+    heatmap_countries = sorted(port_country_matrix['country_description'].unique())
+    port_country_values = _scatter_matrix(
+        port_country_matrix['ausport_description'].to_numpy(),
+        port_country_matrix['country_description'].to_numpy(),
+        port_country_matrix['valuecif'].to_numpy(),
+        heatmap_ports,
+        heatmap_countries
+    ) / 1e9  # Convert to billions
     
     fig = px.imshow(
-        port_country_pivot.values,
+        port_country_values,
         labels=dict(x="Country", y="Australian Port", color="Value (Billions AUD)"),
-        x=port_country_pivot.columns,
-        y=port_country_pivot.index,
+        x=heatmap_countries,
+        y=heatmap_ports,
         color_continuous_scale='YlOrRd',
         aspect="auto",
         title="Port-Country Matrix: Import Value Heatmap"
@@ -1673,38 +1712,39 @@ def show_geographic_analysis(df):
     # Country Concentration and Diversity Analysis
     st.subheader("Port Concentration and Diversity Analysis")
     
-    # Create port_country_matrix for ALL ports and ALL countries (matching notebook logic) - optimize for large datasets
+    # Port totals, country counts and top country share over ALL ports and ALL countries (matching
+    # notebook logic) in flat numpy passes over the port codes of the port x country matrix.
+    # Each (port, country) pair is one row there, so the row count per port is its distinct country count
     try:
-        port_country_matrix = _optimize_groupby_for_large_df(
-            df, ['ausport_description', 'country_description'], {'valuecif': 'sum'}
-        )
+        ports = port_country_full['ausport_description']
+        codes = ports.cat.codes.to_numpy()
+        n_ports = len(ports.cat.categories)
+        values = port_country_full['valuecif'].to_numpy(dtype=np.float64)
+        country_counts = np.bincount(codes, minlength=n_ports)
+        totals = np.bincount(codes, weights=values, minlength=n_ports)
+        pct_of_port = np.round(values / totals[codes] * 100, 2)
+        top_country_pct = np.full(n_ports, np.nan)
+        np.fmax.at(top_country_pct, codes, pct_of_port)
+        observed = np.flatnonzero(country_counts)
+        port_concentration = pd.DataFrame({
+            'port': pd.Categorical.from_codes(observed, dtype=ports.dtype),
+            'total_value': totals[observed],
+            'num_countries': country_counts[observed],
+            'top_country_pct': top_country_pct[observed],
+        })
     except Exception as e:
-        st.error(f"Error calculating full port-country matrix: {str(e)}")
+        st.error(f"Error calculating port concentration: {str(e)}")
         return
-    
-    # Calculate percentage of each country for each port using transform
-    port_totals = port_country_matrix.groupby('ausport_description')['valuecif'].transform('sum')
-    port_country_matrix['pct_of_port'] = (port_country_matrix['valuecif'] / port_totals * 100).round(2)
-    
-    # Create port_concentration dataframe
-    # Use 'nunique' to count UNIQUE countries, not row count
-    # Use 'max' to get top country percentage (no order-dependent iloc[0])
-    port_concentration = port_country_matrix.groupby('ausport_description').agg({
-        'valuecif': 'sum',
-        'country_description': 'nunique',  # Count unique countries, not rows
-        'pct_of_port': 'max'  # Maximum percentage = top country share
-    }).reset_index()
-    port_concentration.columns = ['port', 'total_value', 'num_countries', 'top_country_pct']
     port_concentration = port_concentration.sort_values('total_value', ascending=False)
     
     # Get top 10 ports by total value
-    top_10_ports_concentration = port_concentration.head(10).copy()
+    top_10_ports_concentration = port_concentration.head(10)
     
     col1, col2 = st.columns(2)
     
     with col1:
         # Top Country Concentration Chart
-        fig = px.bar(
+        _plot_bar(
             top_10_ports_concentration,
             x='top_country_pct',
             y='port',
@@ -1713,15 +1753,14 @@ def show_geographic_analysis(df):
             labels={'top_country_pct': 'Top Country Share (%)', 'port': 'Port'},
             color='top_country_pct',
             color_continuous_scale='Blues',
-            text=top_10_ports_concentration['top_country_pct'].round(1).astype(str) + '%'
+            text=top_10_ports_concentration['top_country_pct'].round(1).astype(str) + '%',
+            traces=dict(textposition='outside'),
+            layout=dict(yaxis={'categoryorder': 'total ascending'}, height=500)
         )
-        fig.update_traces(textposition='outside')
-        fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=500)
-        st.plotly_chart(fig, width='stretch')
     
     with col2:
         # Country Diversity Chart
-        fig = px.bar(
+        _plot_bar(
             top_10_ports_concentration,
             x='num_countries',
             y='port',
@@ -1730,39 +1769,35 @@ def show_geographic_analysis(df):
             labels={'num_countries': 'Number of Countries', 'port': 'Port'},
             color='num_countries',
             color_continuous_scale='Oranges',
-            text=top_10_ports_concentration['num_countries'].astype(int).astype(str)
+            text=top_10_ports_concentration['num_countries'].astype(int).astype(str),
+            traces=dict(textposition='outside'),
+            layout=dict(yaxis={'categoryorder': 'total ascending'}, height=500)
         )
-        fig.update_traces(textposition='outside')
-        fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=500)
-        st.plotly_chart(fig, width='stretch')
 
 def show_commodity_analysis(df):
     """Display commodity analysis"""
     st.markdown('<h2 class="section-header"> Commodity Analysis</h2>', unsafe_allow_html=True)
     
     try:
-        commodity_stats = _optimize_groupby_for_large_df(
-            df,
-            'commodity_description',
-            {'valuefob': 'sum', 'valuecif': 'sum', 'weight': 'sum'}
-        ).sort_values('valuecif', ascending=False)
+        commodity_stats = _cached_groupby(df, 'commodity_description', VALUE_TOTALS).sort_values('valuecif', ascending=False)
     except Exception as e:
         st.error(f"Error calculating commodity stats: {str(e)}")
         return
     
-    commodity_stats['valuecif_pct'] = (commodity_stats['valuecif'] / commodity_stats['valuecif'].sum()) * 100
+    # Share of total only for the rows a chart shows, as one fused multiply by 100 / total
+    commodity_pct_scale = 100.0 / commodity_stats['valuecif'].sum()
     
     top_n = st.slider("Select number of top commodities", 5, 30, 15)
     
     # Top commodities by value
     st.subheader("Top Commodities by Value")
     
-    top_commodities = commodity_stats.head(top_n).copy()
-    # Optimize string operations - use vectorized approach with NaN handling
-    top_commodities['commodity_label'] = top_commodities['commodity_description'].astype(str).str[:75] + '...'
-    mask_long = top_commodities['commodity_description'].astype(str).str.len() <= 75
-    top_commodities.loc[mask_long, 'commodity_label'] = top_commodities.loc[mask_long, 'commodity_description'].astype(str)
-    top_commodities['value_billions'] = top_commodities['valuecif'] / 1e9
+    # Derived chart columns via assign - the slice is never copied just to add columns to it
+    top_commodities = commodity_stats.head(top_n).assign(
+        commodity_label=lambda d: _truncate_labels(d['commodity_description']),
+        value_billions=lambda d: d['valuecif'] / 1e9,
+        valuecif_pct=lambda d: d['valuecif'].to_numpy() * commodity_pct_scale
+    )
     
     fig = px.bar(
         top_commodities,
@@ -1783,12 +1818,10 @@ def show_commodity_analysis(df):
     # Top commodities by weight
     st.subheader("Top Commodities by Weight")
     
-    top_commodities_weight = commodity_stats.nlargest(top_n, 'weight').copy()
-    # Optimize string operations - use vectorized approach with NaN handling
-    top_commodities_weight['commodity_label'] = top_commodities_weight['commodity_description'].astype(str).str[:75] + '...'
-    mask_long = top_commodities_weight['commodity_description'].astype(str).str.len() <= 75
-    top_commodities_weight.loc[mask_long, 'commodity_label'] = top_commodities_weight.loc[mask_long, 'commodity_description'].astype(str)
-    top_commodities_weight['weight_millions'] = top_commodities_weight['weight'] / 1e6
+    top_commodities_weight = commodity_stats.nlargest(top_n, 'weight').assign(
+        commodity_label=lambda d: _truncate_labels(d['commodity_description']),
+        weight_millions=lambda d: d['weight'] / 1e6
+    )
     
     fig = px.bar(
         top_commodities_weight,
@@ -1801,9 +1834,11 @@ def show_commodity_analysis(df):
         color_continuous_scale='YlOrBr',
         hover_data={'commodity_description': True, 'commodity_label': False}
     )
-    # Prepare customdata for hover template
-    hover_customdata = [[row['commodity_description'], row['valuecif']/1e9] 
-                        for _, row in top_commodities_weight.iterrows()]
+    # Prepare customdata for hover template - stack the columns instead of walking rows
+    hover_customdata = np.column_stack([
+        top_commodities_weight['commodity_description'].to_numpy(),
+        top_commodities_weight['valuecif'].to_numpy() / 1e9
+    ])
     fig.update_traces(hovertemplate='<b>%{customdata[0]}</b><br>Weight: %{x:.2f} Million Tonnes<br>Value: %{customdata[1]:.2f} Billion AUD<extra></extra>',
                       customdata=hover_customdata)
     fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=600)
@@ -1812,11 +1847,9 @@ def show_commodity_analysis(df):
     # CIF vs FOB Comparison
     st.subheader("CIF vs FOB Comparison for Top Commodities")
     
-    top_10_comm = commodity_stats.head(10).copy()
-    # Optimize string operations - use vectorized approach with NaN handling
-    top_10_comm['commodity_label'] = top_10_comm['commodity_description'].astype(str).str[:75] + '...'
-    mask_long = top_10_comm['commodity_description'].astype(str).str.len() <= 75
-    top_10_comm.loc[mask_long, 'commodity_label'] = top_10_comm.loc[mask_long, 'commodity_description'].astype(str)
+    top_10_comm = commodity_stats.head(10).assign(
+        commodity_label=lambda d: _truncate_labels(d['commodity_description'])
+    )
     
     fig = go.Figure()
     
@@ -1851,32 +1884,17 @@ def show_commodity_analysis(df):
     # SITC Industry Analysis
     st.subheader("SITC-Based Industry Analysis")
     
-    # Create industry_sector if not present (only when needed for this visualization)
-    if 'industry_sector' not in df.columns:
-        if COMMODITY_MAPPING_AVAILABLE:
-            # For large datasets, use optimized approach with unique codes
-            if len(df) > 2000000:
-                unique_codes = df['commodity_code'].unique()
-                code_to_sector = {code: map_commodity_code_to_sitc_industry(code) for code in unique_codes}
-                df['industry_sector'] = df['commodity_code'].map(code_to_sector)
-            else:
-                df['industry_sector'] = df['commodity_code'].apply(map_commodity_code_to_sitc_industry)
-        else:
-            df['industry_sector'] = "Unknown"
+    try:
+        sector_analysis = _industry_sector_totals(df, ['valuecif', 'weight']).sort_values('valuecif', ascending=False)
+    except Exception as e:
+        st.error(f"Error calculating sector analysis: {str(e)}")
+        return
     
-    if 'industry_sector' in df.columns:
-        try:
-            sector_analysis = _optimize_groupby_for_large_df(
-                df, 'industry_sector', {'valuecif': 'sum', 'weight': 'sum'}
-            ).sort_values('valuecif', ascending=False)
-        except Exception as e:
-            st.error(f"Error calculating sector analysis: {str(e)}")
-            return
-        
+    if len(sector_analysis) > 0:
         sector_analysis['valuecif_billions'] = sector_analysis['valuecif'] / 1e9
-        sector_analysis['valuecif_pct'] = (sector_analysis['valuecif'] / sector_analysis['valuecif'].sum()) * 100
+        sector_analysis['valuecif_pct'] = sector_analysis['valuecif'].to_numpy() * (100.0 / sector_analysis['valuecif'].sum())
         
-        fig = px.bar(
+        _plot_bar(
             sector_analysis,
             x='valuecif_billions',
             y='industry_sector',
@@ -1885,34 +1903,18 @@ def show_commodity_analysis(df):
             labels={'valuecif_billions': 'Value (Billions AUD)', 'industry_sector': 'Industry'},
             color='valuecif_billions',
             color_continuous_scale='Viridis',
-            text=sector_analysis['valuecif_pct'].round(1).astype(str) + '%'
+            text=sector_analysis['valuecif_pct'].round(1).astype(str) + '%',
+            traces=dict(textposition='outside'),
+            layout=dict(yaxis={'categoryorder': 'total ascending'}, height=600)
         )
-        fig.update_traces(textposition='outside')
-        fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=600)
-        st.plotly_chart(fig, width='stretch')
 
 def show_value_volume_analysis(df):
     """Display value vs volume analysis"""
     st.markdown('<h2 class="section-header">Value vs Volume Analysis</h2>', unsafe_allow_html=True)
     
-    # Optimize industry sector mapping - only if needed and use vectorized approach
-    if 'industry_sector' not in df.columns:
-        if COMMODITY_MAPPING_AVAILABLE:
-            # For large datasets, sample the unique commodity codes first
-            if len(df) > 2000000:
-                unique_codes = df['commodity_code'].unique()
-                code_to_sector = {code: map_commodity_code_to_sitc_industry(code) for code in unique_codes}
-                df['industry_sector'] = df['commodity_code'].map(code_to_sector)
-            else:
-                df['industry_sector'] = df['commodity_code'].apply(map_commodity_code_to_sitc_industry)
-        else:
-            df['industry_sector'] = "Unknown"
-    
-    # Industry-level analysis - optimize for large datasets
+    # Industry-level analysis - sector totals cached per filtered frame
     try:
-        industry_analysis = _optimize_groupby_for_large_df(
-            df, 'industry_sector', {'valuecif': 'sum', 'weight': 'sum'}
-        )
+        industry_analysis = _industry_sector_totals(df, ['valuecif', 'weight'])
     except Exception as e:
         st.error(f"Error calculating industry analysis: {str(e)}")
         return
@@ -1923,19 +1925,20 @@ def show_value_volume_analysis(df):
     industry_analysis['total_value_billions'] = industry_analysis['valuecif'] / 1e9
     industry_analysis['total_weight_millions'] = industry_analysis['weight'] / 1e6
     
-    industry_analysis = industry_analysis[industry_analysis['weight'] > 0].copy()
+    industry_analysis = industry_analysis[industry_analysis['weight'] > 0]
     
     volume_threshold = industry_analysis['total_value_billions'].median()
     premium_threshold = industry_analysis['value_per_tonne'].median()
     
-    # Classify industries
-    industry_analysis['category'] = 'Standard'
-    market_leaders_mask = industry_analysis['total_value_billions'] >= volume_threshold
-    industry_analysis.loc[market_leaders_mask, 'category'] = 'Market Leader'
-    
-    premium_mask = (industry_analysis['total_value_billions'] < volume_threshold) & \
-                   (industry_analysis['value_per_tonne'] >= premium_threshold)
-    industry_analysis.loc[premium_mask, 'category'] = 'Premium Product'
+    # Classify industries - one np.select over the numpy columns; np.select takes the first
+    # matching condition, so the premium branch only sees below-threshold volumes
+    total_value = industry_analysis['total_value_billions'].to_numpy()
+    value_per_tonne = industry_analysis['value_per_tonne'].to_numpy()
+    industry_analysis = industry_analysis.assign(category=np.select(
+        [total_value >= volume_threshold, value_per_tonne >= premium_threshold],
+        ['Market Leader', 'Premium Product'],
+        default='Standard'
+    ))
     
     # Quadrant Visualization
     st.subheader("Market Leaders vs Premium Products")
@@ -1980,10 +1983,10 @@ def show_value_volume_analysis(df):
     
     market_leaders = industry_analysis[
         industry_analysis['category'] == 'Market Leader'
-    ].sort_values('total_value_billions', ascending=False).copy()
+    ].sort_values('total_value_billions', ascending=False)
     
     if len(market_leaders) > 0:
-        fig = px.bar(
+        _plot_bar(
             market_leaders,
             x='total_value_billions',
             y='industry_sector',
@@ -1991,10 +1994,9 @@ def show_value_volume_analysis(df):
             title="Market Leaders by Total Value",
             labels={'total_value_billions': 'Total Value (Billions AUD)', 'industry_sector': 'Industry'},
             color='total_value_billions',
-            color_continuous_scale='Blues'
+            color_continuous_scale='Blues',
+            layout=dict(yaxis={'categoryorder': 'total ascending'}, height=500)
         )
-        fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=500)
-        st.plotly_chart(fig, width='stretch')
     else:
         st.info("No market leaders found in the filtered data.")
     
@@ -2003,10 +2005,10 @@ def show_value_volume_analysis(df):
     
     premium_products = industry_analysis[
         industry_analysis['category'] == 'Premium Product'
-    ].sort_values('value_per_tonne', ascending=False).copy()
+    ].sort_values('value_per_tonne', ascending=False)
     
     if len(premium_products) > 0:
-        fig = px.bar(
+        _plot_bar(
             premium_products,
             x='value_per_tonne',
             y='industry_sector',
@@ -2014,10 +2016,9 @@ def show_value_volume_analysis(df):
             title="Premium Products by Value per Tonne",
             labels={'value_per_tonne': 'Value per Tonne (AUD)', 'industry_sector': 'Industry'},
             color='value_per_tonne',
-            color_continuous_scale='YlOrBr'
+            color_continuous_scale='YlOrBr',
+            layout=dict(yaxis={'categoryorder': 'total ascending'}, height=400)
         )
-        fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=400)
-        st.plotly_chart(fig, width='stretch')
     else:
         st.info("No premium products found in the filtered data.")
 
@@ -2029,66 +2030,39 @@ def show_risk_analysis(df):
     st.subheader("Country Concentration Risk")
     
     try:
-        commodity_country_matrix = _optimize_groupby_for_large_df(
-            df, ['commodity_description', 'country_description'], {'valuecif': 'sum'}
-        )
+        commodity_country_matrix = _cached_groupby(df, ['commodity_description', 'country_description'], {'valuecif': 'sum'})
     except Exception as e:
         st.error(f"Error calculating commodity-country matrix: {str(e)}")
         return
     
-    commodity_totals = commodity_country_matrix.groupby('commodity_description')['valuecif'].sum().reset_index()
-    commodity_totals.columns = ['commodity_description', 'total_value']
-    
-    commodity_country_matrix = commodity_country_matrix.merge(commodity_totals, on='commodity_description')
-    commodity_country_matrix['country_share'] = (
-        commodity_country_matrix['valuecif'] / commodity_country_matrix['total_value'] * 100
-    )
-    
-    # Optimize HHI calculation - avoid apply with lambda
-    hhi_by_commodity = (commodity_country_matrix.groupby('commodity_description')['country_share']
-                       .apply(lambda x: (x ** 2).sum())
-                       .reset_index())
-    hhi_by_commodity.columns = ['commodity_description', 'hhi_index']
-    
-    top_country_share = commodity_country_matrix.groupby('commodity_description').agg({
-        'country_share': 'max'
-    }).reset_index()
-    top_country_share.columns = ['commodity_description', 'top_country_share']
-    
-    concentration_analysis = commodity_totals.merge(hhi_by_commodity, on='commodity_description')
-    concentration_analysis = concentration_analysis.merge(top_country_share, on='commodity_description')
+    # Totals, HHI and top country share per commodity in flat numpy passes over the commodity
+    # codes - bincount for the sums, maximum.at for the max - with no per-group Python work
+    commodities = commodity_country_matrix['commodity_description']
+    codes = commodities.cat.codes.to_numpy()
+    n_commodities = len(commodities.cat.categories)
+    values = commodity_country_matrix['valuecif'].to_numpy(dtype=np.float64)
+    totals = np.bincount(codes, weights=values, minlength=n_commodities)
+    shares = values / totals[codes] * 100
+    hhi = np.bincount(codes, weights=shares ** 2, minlength=n_commodities)
+    top_share = np.zeros(n_commodities)
+    np.maximum.at(top_share, codes, shares)
+    observed = np.flatnonzero(np.bincount(codes, minlength=n_commodities))
+    concentration_analysis = pd.DataFrame({
+        'commodity_description': pd.Categorical.from_codes(observed, dtype=commodities.dtype),
+        'total_value': totals[observed],
+        'hhi_index': hhi[observed],
+        'top_country_share': top_share[observed],
+    })
     concentration_analysis['total_value_billions'] = concentration_analysis['total_value'] / 1e9
     
-    def classify_risk(hhi, top_share):
-        if hhi >= 2500 or top_share >= 50:
-            return 'HIGH RISK'
-        elif hhi >= 1500 or top_share >= 40:
-            return 'MEDIUM RISK'
-        else:
-            return 'LOW RISK'
-    
-    # Optimize risk classification - use vectorized approach with error handling
-    try:
-        def classify_risk_vectorized(hhi, top_share):
-            # Ensure we're working with numpy arrays
-            hhi = np.asarray(hhi)
-            top_share = np.asarray(top_share)
-            conditions = [
-                (hhi >= 2500) | (top_share >= 50),
-                (hhi >= 1500) | (top_share >= 40)
-            ]
-            choices = ['HIGH RISK', 'MEDIUM RISK']
-            return np.select(conditions, choices, default='LOW RISK')
-        
-        concentration_analysis['risk_level'] = classify_risk_vectorized(
-            concentration_analysis['hhi_index'], 
-            concentration_analysis['top_country_share']
-        )
-    except Exception as e:
-        # Fallback to apply if vectorized fails
-        concentration_analysis['risk_level'] = concentration_analysis.apply(
-            lambda x: classify_risk(x['hhi_index'], x['top_country_share']), axis=1
-        )
+    # Classify on the numpy arrays directly - no per-row Series from apply(axis=1)
+    hhi = concentration_analysis['hhi_index'].to_numpy()
+    top_share = concentration_analysis['top_country_share'].to_numpy()
+    concentration_analysis['risk_level'] = np.select(
+        [(hhi >= 2500) | (top_share >= 50), (hhi >= 1500) | (top_share >= 40)],
+        ['HIGH RISK', 'MEDIUM RISK'],
+        default='LOW RISK'
+    )
     
     # Risk distribution
     risk_counts = concentration_analysis['risk_level'].value_counts()
@@ -2113,13 +2087,10 @@ def show_risk_analysis(df):
         high_risk = concentration_analysis[
             (concentration_analysis['total_value_billions'] >= 1.0) & 
             (concentration_analysis['risk_level'] == 'HIGH RISK')
-        ].sort_values('hhi_index', ascending=False).head(15).copy()
+        ].sort_values('hhi_index', ascending=False).head(15)
         
         if len(high_risk) > 0:
-            # Optimize string operations - use vectorized approach with NaN handling
-            high_risk['commodity_label'] = high_risk['commodity_description'].astype(str).str[:75] + '...'
-            mask_long = high_risk['commodity_description'].astype(str).str.len() <= 75
-            high_risk.loc[mask_long, 'commodity_label'] = high_risk.loc[mask_long, 'commodity_description'].astype(str)
+            high_risk = high_risk.assign(commodity_label=_truncate_labels(high_risk['commodity_description']))
             fig = px.bar(
                 high_risk,
                 x='hhi_index',
@@ -2143,79 +2114,35 @@ def show_risk_analysis(df):
     # Commodity Dependence Analysis
     st.subheader("Commodity Dependence Index")
     
-    # Optimize sum calculation for large datasets
-    if len(df) == 0:
-        total_import_value = 0
-    elif len(df) > 2000000:
-        try:
-            sample_size = min(1000000, len(df))
-            sample_indices = np.random.choice(df.index, size=sample_size, replace=False)
-            df_sample = df.loc[sample_indices]
-            if len(df_sample) > 0:
-                scale_factor = len(df) / len(df_sample)
-                total_import_value = df_sample['valuecif'].sum() * scale_factor
-            else:
-                total_import_value = df['valuecif'].sum()
-        except Exception:
-            # Fallback to direct sum if sampling fails
-            total_import_value = df['valuecif'].sum()
-    else:
-        total_import_value = df['valuecif'].sum()
+    total_import_value = _value_totals(df)['valuecif']
     
     try:
-        commodity_dependence = _optimize_groupby_for_large_df(
-            df, 'commodity_description', {'valuecif': 'sum'}
-        )
+        commodity_dependence = _cached_groupby(df, 'commodity_description', VALUE_TOTALS)
     except Exception as e:
         st.error(f"Error calculating commodity dependence: {str(e)}")
         return
     
-    commodity_dependence['dependence_pct'] = (commodity_dependence['valuecif'] / total_import_value * 100)
+    commodity_dependence['dependence_pct'] = commodity_dependence['valuecif'].to_numpy() * (100.0 / total_import_value)
     commodity_dependence['total_value_billions'] = commodity_dependence['valuecif'] / 1e9
     
-    def classify_dependence(pct, value_billions):
-        if pct >= 5.0 or value_billions >= 40:
-            return 'CRITICAL'
-        elif pct >= 2.0 or value_billions >= 15:
-            return 'HIGH'
-        elif pct >= 0.5 or value_billions >= 4:
-            return 'MODERATE'
-        else:
-            return 'LOW'
-    
-    # Optimize dependence classification - use vectorized approach with error handling
-    try:
-        def classify_dependence_vectorized(pct, value_billions):
-            # Ensure we're working with numpy arrays
-            pct = np.asarray(pct)
-            value_billions = np.asarray(value_billions)
-            conditions = [
-                (pct >= 5.0) | (value_billions >= 40),
-                (pct >= 2.0) | (value_billions >= 15),
-                (pct >= 0.5) | (value_billions >= 4)
-            ]
-            choices = ['CRITICAL', 'HIGH', 'MODERATE']
-            return np.select(conditions, choices, default='LOW')
-        
-        commodity_dependence['dependence_level'] = classify_dependence_vectorized(
-            commodity_dependence['dependence_pct'],
-            commodity_dependence['total_value_billions']
-        )
-    except Exception as e:
-        # Fallback to apply if vectorized fails
-        commodity_dependence['dependence_level'] = commodity_dependence.apply(
-            lambda x: classify_dependence(x['dependence_pct'], x['total_value_billions']), axis=1
-        )
+    pct = commodity_dependence['dependence_pct'].to_numpy()
+    value_billions = commodity_dependence['total_value_billions'].to_numpy()
+    commodity_dependence['dependence_level'] = np.select(
+        [
+            (pct >= 5.0) | (value_billions >= 40),
+            (pct >= 2.0) | (value_billions >= 15),
+            (pct >= 0.5) | (value_billions >= 4)
+        ],
+        ['CRITICAL', 'HIGH', 'MODERATE'],
+        default='LOW'
+    )
     
     critical_high = commodity_dependence[
         commodity_dependence['dependence_level'].isin(['CRITICAL', 'HIGH'])
-    ].sort_values('dependence_pct', ascending=False).head(20).copy()
+    ].sort_values('dependence_pct', ascending=False).head(20)
     
     if len(critical_high) > 0:
-        # Optimize string operations - use vectorized approach with NaN handling
-        critical_high['commodity_label'] = critical_high['commodity_description'].astype(str).str[:75] + '...'
-        mask_long = critical_high['commodity_description'].astype(str).str.len() <= 75
-        critical_high.loc[mask_long, 'commodity_label'] = critical_high.loc[mask_long, 'commodity_description'].astype(str)
+        critical_high = critical_high.assign(commodity_label=_truncate_labels(critical_high['commodity_description']))
         fig = px.bar(
             critical_high,
             x='dependence_pct',
@@ -2245,114 +2172,85 @@ def show_risk_analysis(df):
     st.subheader("Supplier Trend Analysis (2024 vs 2025)")
     
     try:
-        country_yearly = _optimize_groupby_for_large_df(
-            df, ['country_description', 'year'], {'valuecif': 'sum'}
-        )
+        country_yearly = _cached_groupby(df, ['country_description', 'year'], {'valuecif': 'sum'})
     except Exception as e:
         st.error(f"Error calculating country yearly stats: {str(e)}")
         return
     
-    # Optimize pivot operation - use unstack instead
-    unique_years = country_yearly['year'].unique()
-    if len(unique_years) >= 2:
-        try:
-            country_indexed = country_yearly.set_index(['country_description', 'year'])['valuecif']
-            # Check for duplicates and aggregate if needed
-            if country_indexed.index.duplicated().any():
-                country_indexed = country_indexed.groupby(level=[0, 1]).sum()
-            country_pivot = country_indexed.unstack(fill_value=0).reset_index()
-        except Exception as e:
-            # Fallback to pivot_table if unstack fails
-            country_pivot = country_yearly.pivot_table(
-                index='country_description',
-                columns='year',
-                values='valuecif',
-                fill_value=0
-            ).reset_index()
+    # 2024 vs 2025 per supplier: two year-masked bincounts over the country codes of the
+    # cached country x year sums, instead of pivoting every year out
+    years = country_yearly['year'].to_numpy()
+    if (years == 2024).any() and (years == 2025).any():
+        countries = country_yearly['country_description']
+        codes = countries.cat.codes.to_numpy()
+        n_countries = len(countries.cat.categories)
+        values = country_yearly['valuecif'].to_numpy(dtype=np.float64)
+        observed = np.flatnonzero(np.bincount(codes, minlength=n_countries))
+        country_trends = pd.DataFrame({
+            'country': countries.cat.categories[observed],
+            'value_2024': np.bincount(codes, weights=np.where(years == 2024, values, 0.0), minlength=n_countries)[observed],
+            'value_2025': np.bincount(codes, weights=np.where(years == 2025, values, 0.0), minlength=n_countries)[observed],
+        })
+        country_trends['absolute_change'] = country_trends['value_2025'] - country_trends['value_2024']
         
-        year_cols = [col for col in country_pivot.columns if col != 'country_description']
-        if len(year_cols) >= 2:
-            country_pivot.columns = ['country'] + [f'value_{int(col)}' for col in year_cols]
-            
-            country_trends = country_pivot.copy()
-            if 'value_2024' in country_trends.columns and 'value_2025' in country_trends.columns:
-                country_trends['absolute_change'] = country_trends['value_2025'] - country_trends['value_2024']
-                country_trends['pct_change'] = (
-                    (country_trends['value_2025'] - country_trends['value_2024']) / 
-                    country_trends['value_2024'].replace(0, np.nan) * 100
-                ).fillna(0)
-                
-                country_trends_filtered = country_trends[
-                    (country_trends['value_2024'] > 100_000_000) | 
-                    (country_trends['value_2025'] > 100_000_000)
-                ].copy()
-                
-                declining = country_trends_filtered.nsmallest(15, 'absolute_change').copy()
-                growing = country_trends_filtered.nlargest(15, 'absolute_change').copy()
-                
-                declining['change_billions'] = declining['absolute_change'] / 1e9
-                # Optimize string operations - use vectorized approach with NaN handling
-                declining['country_label'] = declining['country'].astype(str).str[:40] + '...'
-                mask_long = declining['country'].astype(str).str.len() <= 40
-                declining.loc[mask_long, 'country_label'] = declining.loc[mask_long, 'country'].astype(str)
-                
-                growing['change_billions'] = growing['absolute_change'] / 1e9
-                growing['country_label'] = growing['country'].astype(str).str[:40] + '...'
-                mask_long = growing['country'].astype(str).str.len() <= 40
-                growing.loc[mask_long, 'country_label'] = growing.loc[mask_long, 'country'].astype(str)
-                
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    if len(declining) > 0:
-                        fig = px.bar(
-                            declining,
-                            x='change_billions',
-                            y='country_label',
-                            orientation='h',
-                            title="Top 15 Declining Suppliers",
-                            labels={'change_billions': 'Change (Billions AUD)', 'country_label': 'Country'},
-                            color='absolute_change',
-                            color_continuous_scale='Reds'
-                        )
-                        fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=500)
-                        st.plotly_chart(fig, width='stretch')
-                    else:
-                        st.info("No declining suppliers found.")
-                
-                with col2:
-                    if len(growing) > 0:
-                        fig = px.bar(
-                            growing,
-                            x='change_billions',
-                            y='country_label',
-                            orientation='h',
-                            title="Top 15 Growing Suppliers",
-                            labels={'change_billions': 'Change (Billions AUD)', 'country_label': 'Country'},
-                            color='absolute_change',
-                            color_continuous_scale='Greens'
-                        )
-                        fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=500)
-                        st.plotly_chart(fig, width='stretch')
-                    else:
-                        st.info("No growing suppliers found.")
+        country_trends_filtered = country_trends[
+            (country_trends['value_2024'] > 100_000_000) | 
+            (country_trends['value_2025'] > 100_000_000)
+        ]
+        
+        declining = country_trends_filtered.nsmallest(15, 'absolute_change').assign(
+            change_billions=lambda d: d['absolute_change'] / 1e9,
+            country_label=lambda d: _truncate_labels(d['country'], 40)
+        )
+        growing = country_trends_filtered.nlargest(15, 'absolute_change').assign(
+            change_billions=lambda d: d['absolute_change'] / 1e9,
+            country_label=lambda d: _truncate_labels(d['country'], 40)
+        )
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            if len(declining) > 0:
+                _plot_bar(
+                    declining,
+                    x='change_billions',
+                    y='country_label',
+                    orientation='h',
+                    title="Top 15 Declining Suppliers",
+                    labels={'change_billions': 'Change (Billions AUD)', 'country_label': 'Country'},
+                    color='absolute_change',
+                    color_continuous_scale='Reds',
+                    layout=dict(yaxis={'categoryorder': 'total ascending'}, height=500)
+                )
+            else:
+                st.info("No declining suppliers found.")
+        
+        with col2:
+            if len(growing) > 0:
+                _plot_bar(
+                    growing,
+                    x='change_billions',
+                    y='country_label',
+                    orientation='h',
+                    title="Top 15 Growing Suppliers",
+                    labels={'change_billions': 'Change (Billions AUD)', 'country_label': 'Country'},
+                    color='absolute_change',
+                    color_continuous_scale='Greens',
+                    layout=dict(yaxis={'categoryorder': 'total ascending'}, height=500)
+                )
+            else:
+                st.info("No growing suppliers found.")
 
 def show_transport_mode_analysis(df):
     """Display transport mode analysis"""
     st.markdown('<h2 class="section-header">Transport Mode Analysis</h2>', unsafe_allow_html=True)
     
     try:
-        mode_stats = _optimize_groupby_for_large_df(
-            df,
-            'mode_description',
-            {'valuefob': 'sum', 'valuecif': 'sum', 'weight': 'sum', 'quantity': 'sum'}
-        ).sort_values('valuefob', ascending=False)
+        mode_stats = _cached_groupby(df, 'mode_description', VALUE_TOTALS).sort_values('valuefob', ascending=False)
     except Exception as e:
         st.error(f"Error calculating mode stats: {str(e)}")
         return
     
-    mode_stats['valuefob_pct'] = (mode_stats['valuefob'] / mode_stats['valuefob'].sum()) * 100
-    
     col1, col2 = st.columns(2)
     
     with col1:
@@ -2393,86 +2291,107 @@ def show_transport_mode_analysis(df):
     fig.update_xaxes(tickangle=45)
     st.plotly_chart(fig, width='stretch')
 
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: _frame_key}, max_entries=8)
+def _key_insights(df):
+    """Top country/commodity/mode/state, year-over-year growth and concentration shares
+    A handful of names and floats per filter state, so reruns only re-render them
+    """
+    # Unsorted - only the top row / top-k of each is read, via idxmax and nlargest
+    country_stats = _cached_groupby(df, 'country_description', VALUE_TOTALS)
+    commodity_stats = _cached_groupby(df, 'commodity_description', VALUE_TOTALS)
+    mode_stats = _cached_groupby(df, 'mode_description', VALUE_TOTALS)
+    state_stats = _cached_groupby(df, 'state', VALUE_TOTALS)
+    yearly_stats = _cached_groupby(df, 'year', VALUE_TOTALS)
+    
+    # Per-year sums as plain arrays (years ascending); the overall totals every share below divides
+    # by, and the year-over-year figures, are read straight off them
+    yearly_cif = yearly_stats['valuecif'].to_numpy()
+    yearly_fob = yearly_stats['valuefob'].to_numpy()
+    totals = {'valuecif': yearly_cif.sum(dtype=np.float64), 'valuefob': yearly_fob.sum(dtype=np.float64)}
+    
+    def top(stats, key, value_col):
+        # Plain key/sum arrays - argmax and two scalar reads, no row Series
+        sums = stats[value_col].to_numpy()
+        i = sums.argmax()
+        return {'name': stats[key].array[i], 'value': sums[i], 'pct': sums[i] / totals[value_col] * 100}
+    
+    insights = {
+        'top_country': top(country_stats, 'country_description', 'valuecif'),
+        'top_commodity': top(commodity_stats, 'commodity_description', 'valuecif'),
+        'top_mode': top(mode_stats, 'mode_description', 'valuefob'),
+        'top_state': top(state_stats, 'state', 'valuecif'),
+        'top_5_countries_pct': country_stats['valuecif'].nlargest(5).sum() / totals['valuecif'] * 100,
+        'top_10_commodities_pct': commodity_stats['valuecif'].nlargest(10).sum() / totals['valuecif'] * 100,
+        'yoy': None,
+    }
+    # Zero-guarded: a first year with no FOB value has no defined growth rate
+    if len(yearly_fob) > 1 and yearly_fob[0] != 0:
+        first_fob, second_fob = yearly_fob[0], yearly_fob[1]
+        insights['yoy'] = {
+            'growth': (second_fob - first_fob) / first_fob * 100,
+            'delta_billions': second_fob / 1e9 - first_fob / 1e9,
+        }
+    return insights
+
 def show_key_insights(df):
     """Display key insights and summary"""
     st.markdown('<h2 class="section-header">Key Insights</h2>', unsafe_allow_html=True)
     
-    # Calculate key metrics - optimize for large datasets
-    try:
-        country_stats = _optimize_groupby_for_large_df(
-            df, 'country_description', {'valuecif': 'sum'}
-        ).sort_values('valuecif', ascending=False)
-        country_stats['valuecif_pct'] = (country_stats['valuecif'] / country_stats['valuecif'].sum()) * 100
-        
-        commodity_stats = _optimize_groupby_for_large_df(
-            df, 'commodity_description', {'valuecif': 'sum'}
-        ).sort_values('valuecif', ascending=False)
-        commodity_stats['valuecif_pct'] = (commodity_stats['valuecif'] / commodity_stats['valuecif'].sum()) * 100
-        
-        mode_stats = _optimize_groupby_for_large_df(
-            df, 'mode_description', {'valuefob': 'sum'}
-        ).sort_values('valuefob', ascending=False)
-        mode_stats['valuefob_pct'] = (mode_stats['valuefob'] / mode_stats['valuefob'].sum()) * 100
-        
-        state_stats = _optimize_groupby_for_large_df(
-            df, 'state', {'valuecif': 'sum'}
-        ).sort_values('valuecif', ascending=False)
-        state_stats['valuecif_pct'] = (state_stats['valuecif'] / state_stats['valuecif'].sum()) * 100
-        
-        yearly_stats = _optimize_groupby_for_large_df(
-            df, 'year', {'valuefob': 'sum'}
-        )
-    except Exception as e:
-        st.error(f"Error calculating insights: {str(e)}")
+    # Nothing to rank for a filter selection that matches no rows - skip the aggregations entirely
+    if df.empty:
+        st.info("No data for the selected filters.")
         return
     
+    # Calculate key metrics (cached per filter state); errors surface through main()'s per-section
+    # handler, which also shows the traceback
+    insights = _key_insights(df)
+    
     # Display insights
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown("### Top Statistics")
         
-        top_country = country_stats.iloc[0]
-        st.info(f"**Top Import Source:** {top_country['country_description']}\n\n"
-                f"Value: ${top_country['valuecif']/1e9:.2f}B ({top_country['valuecif_pct']:.2f}% of total)")
+        top_country = insights['top_country']
+        st.info(f"**Top Import Source:** {top_country['name']}\n\n"
+                f"Value: ${top_country['value']/1e9:.2f}B ({top_country['pct']:.2f}% of total)")
         
-        top_commodity = commodity_stats.iloc[0]
-        commodity_name = top_commodity['commodity_description'][:80] + '...' if len(top_commodity['commodity_description']) > 80 else top_commodity['commodity_description']
+        top_commodity = insights['top_commodity']
+        commodity_name = top_commodity['name'][:80] + '...' if len(top_commodity['name']) > 80 else top_commodity['name']
         st.info(f"**Top Import Commodity:** {commodity_name}\n\n"
-                f"Value: ${top_commodity['valuecif']/1e9:.2f}B ({top_commodity['valuecif_pct']:.2f}% of total)")
+                f"Value: ${top_commodity['value']/1e9:.2f}B ({top_commodity['pct']:.2f}% of total)")
     
     with col2:
         st.markdown("### Additional Insights")
         
-        top_mode = mode_stats.iloc[0]
-        st.info(f"**Dominant Transport Mode:** {top_mode['mode_description']}\n\n"
-                f"Value: ${top_mode['valuefob']/1e9:.2f}B ({top_mode['valuefob_pct']:.2f}% of total)")
+        top_mode = insights['top_mode']
+        st.info(f"**Dominant Transport Mode:** {top_mode['name']}\n\n"
+                f"Value: ${top_mode['value']/1e9:.2f}B ({top_mode['pct']:.2f}% of total)")
         
-        top_state = state_stats.iloc[0]
-        st.info(f"**Top Import State:** {top_state['state']}\n\n"
-                f"Value: ${top_state['valuecif']/1e9:.2f}B ({top_state['valuecif_pct']:.2f}% of total)")
+        top_state = insights['top_state']
+        st.info(f"**Top Import State:** {top_state['name']}\n\n"
+                f"Value: ${top_state['value']/1e9:.2f}B ({top_state['pct']:.2f}% of total)")
     
     # Year-over-year growth
-    if len(yearly_stats) > 1:
-        yoy_growth = ((yearly_stats.iloc[1]['valuefob'] - yearly_stats.iloc[0]['valuefob']) / 
-                     yearly_stats.iloc[0]['valuefob']) * 100
+    if insights['yoy'] is not None:
         st.markdown("### Year-over-Year Growth")
         st.metric(
             "Growth Rate",
-            f"{yoy_growth:+.2f}%",
-            delta=f"{yearly_stats.iloc[1]['valuefob']/1e9 - yearly_stats.iloc[0]['valuefob']/1e9:.2f}B"
+            f"{insights['yoy']['growth']:+.2f}%",
+            delta=f"{insights['yoy']['delta_billions']:.2f}B"
         )
+    else:
+        st.markdown("### Year-over-Year Growth")
+        st.info("Year-over-year growth needs at least two years with import value in the current selection.")
     
     # Market concentration
     st.markdown("### Market Concentration")
-    top_5_countries_pct = country_stats.head(5)['valuecif_pct'].sum()
-    top_10_commodities_pct = commodity_stats.head(10)['valuecif_pct'].sum()
     
     col1, col2 = st.columns(2)
     with col1:
-        st.metric("Top 5 Countries Share", f"{top_5_countries_pct:.2f}%")
+        st.metric("Top 5 Countries Share", f"{insights['top_5_countries_pct']:.2f}%")
     with col2:
-        st.metric("Top 10 Commodities Share", f"{top_10_commodities_pct:.2f}%")
+        st.metric("Top 10 Commodities Share", f"{insights['top_10_commodities_pct']:.2f}%")
 
 if __name__ == "__main__":
     try:
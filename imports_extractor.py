@@ -86,30 +86,17 @@ def extract_imports_data(year_filter=None):
                         chunks.append(chunk)
                         logger.info(f"Processed chunk with {len(chunk)} records (total processed: {total_processed:,})")
                     
-                    # Clean up memory aggressively
+                    # Drop the reference so refcounting frees the chunk right away
                     del chunk
-                    import gc
-                    gc.collect()
                     
                     if total_processed % 500000 == 0:  # Log every 500k rows
                         logger.info(f"Processed {total_processed:,} rows...")
                 
                 if chunks:
-                    logger.info("Combining chunks...")
-                    # Process chunks in smaller batches to avoid memory issues
-                    batch_size = 2  # Process 2 chunks at a time
-                    combined_chunks = []
-                    
-                    for i in range(0, len(chunks), batch_size):
-                        batch = chunks[i:i+batch_size]
-                        logger.info(f"Processing batch {i//batch_size + 1}/{(len(chunks)-1)//batch_size + 1}")
-                        combined_batch = pd.concat(batch, ignore_index=True)
-                        combined_chunks.append(combined_batch)
-                        # Clean up memory
-                        del batch, combined_batch
-                    
-                    # Final combination
-                    df = pd.concat(combined_chunks, ignore_index=True)
+                    logger.info(f"Combining {len(chunks)} chunks...")
+                    # One concat allocates the result once; batching first copies every row twice
+                    df = pd.concat(chunks, ignore_index=True)
+                    del chunks
                     logger.info(f"Successfully combined {len(df):,} records")
                 else:
                     logger.warning("No data found")
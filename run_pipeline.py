@@ -55,6 +55,10 @@ ANALYSIS_OUTPUT_DIR.mkdir(exist_ok=True)
 TOP_N_COUNTRIES = 15
 TOP_N_COMMODITIES = 15
 TOP_N_PORTS = 10
+# Columns read by the analysis step - the rest of the cleaned CSV is never parsed
+ANALYSIS_TOTAL_COLUMNS = ['valuefob', 'valuecif', 'weight', 'quantity']
+ANALYSIS_DETAIL_COLUMNS = ['year', 'country_description', 'commodity_description',
+                           'ausport_description', 'mode_description', 'state', 'valuecif']
 
 # Dashboard Configuration
 DASHBOARD_PORT = 8501
@@ -301,19 +305,9 @@ def step2_clean_data(input_path=None, output_path=None):
         
         logger.info(f"Combining {len(chunks)} cleaned chunks...")
         
-        # Combine chunks in batches
-        batch_size = 5
-        combined_chunks = []
-        for i in range(0, len(chunks), batch_size):
-            batch = chunks[i:i+batch_size]
-            logger.info(f"Combining batch {i//batch_size + 1}/{(len(chunks)-1)//batch_size + 1}")
-            combined_batch = pd.concat(batch, ignore_index=True)
-            combined_chunks.append(combined_batch)
-            del batch, combined_batch
-            import gc
-            gc.collect()
-        
-        df_clean = pd.concat(combined_chunks, ignore_index=True)
+        # One concat allocates the result once; batching first copies every row twice
+        df_clean = pd.concat(chunks, ignore_index=True)
+        del chunks
         
         # Remove duplicates
         initial_count = len(df_clean)
@@ -387,7 +381,7 @@ def step3_analyze_data(input_path=None, output_dir=None):
         chunk_size = 100000
         chunks_processed = 0
         
-        for chunk in pd.read_csv(input_path, chunksize=chunk_size):
+        for chunk in pd.read_csv(input_path, usecols=ANALYSIS_TOTAL_COLUMNS, chunksize=chunk_size):
             chunks_processed += 1
             summary_stats['total_records'] += len(chunk)
             summary_stats['total_value_fob'] += chunk['valuefob'].sum()
@@ -402,9 +396,11 @@ def step3_analyze_data(input_path=None, output_dir=None):
         
         # Load sample for detailed analysis
         logger.info("Loading data for detailed analysis...")
-        df = pd.read_csv(input_path, nrows=1000000)
+        # Callable usecols skips absent columns instead of raising; each block below checks for its columns
+        detail_columns = lambda col: col in ANALYSIS_DETAIL_COLUMNS
+        df = pd.read_csv(input_path, usecols=detail_columns, nrows=1000000)
         if summary_stats['total_records'] <= 1000000:
-            df = pd.read_csv(input_path)
+            df = pd.read_csv(input_path, usecols=detail_columns)
         
         logger.info(f"Analyzing {len(df):,} records...")
         
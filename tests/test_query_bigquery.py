@@ -0,0 +1,101 @@
+import unittest
+from unittest import mock
+
+import pyarrow as pa
+
+import dashboard
+
+
+SECRETS = {
+    'gcp': {
+        'bigquery_project': 'test-project',
+        'credentials': {'project_id': 'test-project', 'client_email': 'loader@test-project.iam'},
+    }
+}
+
+
+class QueryBigQueryTest(unittest.TestCase):
+    """query_bigquery with the Google client libraries replaced by mocks"""
+
+    def setUp(self):
+        self.bigquery = mock.MagicMock()
+        self.bigquery_storage = mock.MagicMock()
+        self.service_account = mock.MagicMock()
+
+        batch = pa.record_batch({
+            'year': pa.array([2024, 2025], pa.int64()),
+            'country_description': pa.array(['China', 'Japan']),
+            'valuecif': pa.array([1.5, 2.5], pa.float64()),
+        })
+        query_job = self.bigquery.Client.return_value.query.return_value
+        query_job.done.return_value = True
+        query_job.errors = None
+        query_job.result.return_value.to_arrow_iterable.return_value = [batch]
+        self.query_job = query_job
+
+        patches = [
+            mock.patch.object(dashboard, 'BIGQUERY_AVAILABLE', True),
+            mock.patch.object(dashboard, 'BQSTORAGE_AVAILABLE', True),
+            mock.patch.object(dashboard, 'bigquery', self.bigquery, create=True),
+            mock.patch.object(dashboard, 'bigquery_storage', self.bigquery_storage, create=True),
+            mock.patch.object(dashboard, 'service_account', self.service_account, create=True),
+            mock.patch.object(dashboard.st, 'secrets', SECRETS),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        # Cached results and clients would otherwise leak between tests
+        for cached in (dashboard.query_bigquery, dashboard._get_gcp_credentials,
+                       dashboard._get_bigquery_client, dashboard._get_bigquery_read_client):
+            cached.clear()
+            self.addCleanup(cached.clear)
+
+    def test_streams_results_through_bigquery_storage_client(self):
+        df = dashboard.query_bigquery(columns=['year', 'country_description', 'valuecif'])
+
+        self.assertIsNotNone(df)
+        self.assertEqual(len(df), 2)
+        self.assertEqual(str(df['year'].dtype), 'int16')
+        self.assertEqual(str(df['valuecif'].dtype), 'float32')
+        self.assertEqual(str(df['country_description'].dtype), 'category')
+
+        credentials = self.service_account.Credentials.from_service_account_info.return_value
+        self.bigquery_storage.BigQueryReadClient.assert_called_once_with(credentials=credentials)
+        self.query_job.result.return_value.to_arrow_iterable.assert_called_once_with(
+            bqstorage_client=self.bigquery_storage.BigQueryReadClient.return_value
+        )
+
+    def test_repeat_call_returns_the_cached_frame_without_querying(self):
+        first = dashboard.query_bigquery(columns=['year', 'country_description', 'valuecif'])
+        second = dashboard.query_bigquery(columns=['year', 'country_description', 'valuecif'])
+
+        self.assertIs(first, second)
+        self.bigquery.Client.return_value.query.assert_called_once()
+
+    def test_null_integer_values_keep_their_rows(self):
+        batch = pa.record_batch({
+            'year': pa.array([2024, None], pa.int64()),
+            'month_number': pa.array([None, 3], pa.int64()),
+            'valuecif': pa.array([1.5, 2.5], pa.float64()),
+        })
+        self.query_job.result.return_value.to_arrow_iterable.return_value = [batch]
+
+        df = dashboard.query_bigquery(columns=['year', 'month_number', 'valuecif'])
+
+        self.assertIsNotNone(df)
+        self.assertEqual(len(df), 2)
+        self.assertEqual(str(df['year'].dtype), 'float64')
+        self.assertEqual(df['month_number'].isna().sum(), 1)
+
+    def test_falls_back_to_rest_paging_without_bigquery_storage(self):
+        with mock.patch.object(dashboard, 'BQSTORAGE_AVAILABLE', False):
+            df = dashboard.query_bigquery(columns=['year', 'country_description', 'valuecif'])
+
+        self.assertIsNotNone(df)
+        self.bigquery_storage.BigQueryReadClient.assert_not_called()
+        self.query_job.result.return_value.to_arrow_iterable.assert_called_once_with(bqstorage_client=None)
+
+
+if __name__ == '__main__':
+    unittest.main()